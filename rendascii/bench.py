@@ -0,0 +1,546 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import rendascii
+from rendascii.geometry import kernel, polygon, vector
+from rendascii.interface import Engine
+from rendascii.pipeline import RASTER_FRAGMENT, RASTER_NUMPY, RASTER_SCANLINE
+from rendascii.utility import RenderStats, Transformer
+import sys
+import tempfile
+import time
+
+
+# Module constants.
+SCENES = ('cube', 'cube_grid', 'cube_world', 'sphere', 'sprites', 'overlay',)
+DEFAULT_RESOLUTIONS = ((80, 24,), (160, 48,), (320, 96,),)
+CUBE_COLORS = ('ff0000', '00ff00', '0000ff',)
+KERNEL_CALLS = 100000
+KERNEL_VECTOR_H = (0.5, -1.25, 3.0, 4.0,)
+KERNEL_FOCUS_H = (-0.75, 2.0, -1.0, 1.5,)
+KERNEL_PLANE_H = ((0.0, 0.0, -1.0, 0.0,), (0.0, 0.7, 0.7, 0.0,),)
+KERNEL_TRI_2D = ((-0.5, -0.25,), (0.75, -0.5,), (0.0, 0.5,),)
+KERNEL_TRI_3D = ((-0.5, -0.25, 2.0,), (0.75, -0.5, 2.5,), (0.0, 0.5, 3.0,),)
+KERNEL_POINT_2D = (0.1, 0.05,)
+PALETTE = {
+    '000000': '',
+    'ff0000': '#',
+    '00ff00': 'o',
+    '0000ff': '.',
+    'ffffff': '@',
+    '808080': '+',
+}
+
+
+def main(argv=None):
+    # Parse arguments.
+    parser = argparse.ArgumentParser(
+        prog='rendascii-bench',
+        description='Time RendASCII pipeline stages on synthetic scenes.'
+    )
+    parser.add_argument(
+        '--scenes',
+        nargs='+',
+        choices=SCENES,
+        default=SCENES,
+        help='scenes to render (default: all)'
+    )
+    parser.add_argument(
+        '--resolutions',
+        nargs='+',
+        type=_parse_resolution,
+        default=DEFAULT_RESOLUTIONS,
+        metavar='WxH',
+        help='camera resolutions (default: 80x24 160x48 320x96)'
+    )
+    parser.add_argument(
+        '--frames',
+        type=int,
+        default=10,
+        help='timed frames per run (default: 10)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Pool size for Pool mode, 0 to skip it (default: CPU count)'
+    )
+    parser.add_argument(
+        '--rasterizer',
+        choices=(RASTER_FRAGMENT, RASTER_NUMPY, RASTER_SCANLINE,),
+        default=RASTER_FRAGMENT,
+        help='rasterizer (default: fragment)'
+    )
+    parser.add_argument(
+        '--grid-size',
+        type=int,
+        default=64,
+        help='number of cubes in cube_grid and cube_world (default: 64)'
+    )
+    parser.add_argument(
+        '--sphere-segments',
+        type=int,
+        default=64,
+        help='longitudinal segments of sphere scene (default: 64)'
+    )
+    parser.add_argument(
+        '--sprites',
+        type=int,
+        default=200,
+        help='number of sprites in sprites scene (default: 200)'
+    )
+    parser.add_argument(
+        '--spatial-index',
+        action='store_true',
+        help='index model instances in a loose octree'
+    )
+    parser.add_argument(
+        '--lod-levels',
+        type=int,
+        default=0,
+        help='levels of detail decimated from sphere scene (default: 0)'
+    )
+    parser.add_argument(
+        '--kernels',
+        action='store_true',
+        help='also time geometry kernels against generic functions'
+    )
+    parser.add_argument(
+        '--output',
+        default=None,
+        help='JSON results file (default: stdout)'
+    )
+    args = parser.parse_args(argv)
+
+    # Run benchmarks.
+    results = run(
+        args.scenes,
+        args.resolutions,
+        args.frames,
+        args.workers,
+        args.rasterizer,
+        args.grid_size,
+        args.sphere_segments,
+        args.sprites,
+        args.spatial_index,
+        args.lod_levels
+    )
+    if args.kernels:
+        results['kernels'] = bench_kernels()
+
+    # Emit results.
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w') as f_out:
+            json.dump(results, f_out, indent=2)
+
+
+def run(
+    scenes=SCENES,
+    resolutions=DEFAULT_RESOLUTIONS,
+    num_frames=10,
+    num_workers=0,
+    rasterizer=RASTER_FRAGMENT,
+    grid_size=64,
+    sphere_segments=64,
+    num_sprites=200,
+    spatial_index=False,
+    lod_levels=0
+):
+    # Serial mode always runs, Pool mode only with workers.
+    modes = (0,) if num_workers <= 0 else (0, num_workers,)
+
+    runs = []
+    with tempfile.TemporaryDirectory() as resource_dir:
+        _write_resources(resource_dir, sphere_segments)
+        for workers in modes:
+            for scene in scenes:
+                for resolution in resolutions:
+                    runs.append(
+                        bench_scene(
+                            resource_dir,
+                            scene,
+                            tuple(resolution),
+                            num_frames,
+                            workers,
+                            rasterizer,
+                            grid_size,
+                            num_sprites,
+                            spatial_index,
+                            lod_levels
+                        )
+                    )
+
+    return {
+        'rendascii': rendascii.__version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'frames': num_frames,
+        'rasterizer': rasterizer,
+        'spatial_index': spatial_index,
+        'lod_levels': lod_levels,
+        'runs': runs,
+    }
+
+
+def bench_scene(
+    resource_dir,
+    scene,
+    resolution,
+    num_frames,
+    num_workers,
+    rasterizer,
+    grid_size,
+    num_sprites,
+    spatial_index,
+    lod_levels
+):
+    # Build scene.
+    engine = Engine(
+        resource_dir,
+        resource_dir,
+        resource_dir,
+        resource_dir,
+        num_workers=num_workers,
+        rasterizer=rasterizer,
+        spatial_index=spatial_index
+    )
+    try:
+        camera = engine.create_camera(resolution)
+        instances, overlay = _build_scene(
+            engine,
+            scene,
+            resolution,
+            grid_size,
+            num_sprites,
+            lod_levels
+        )
+
+        # Warm up caches and workers before timing.
+        _animate(instances, 0)
+        engine.render_frame(camera, overlay)
+
+        # Time frames, moving every instance so no frame is cached.
+        stats = RenderStats(window=num_frames)
+        engine.set_stats(stats)
+        frame_times = []
+        for frame in range(1, num_frames + 1):
+            _animate(instances, frame)
+            engine.render_frame(camera, overlay)
+            frame_times.append(stats.get_last_frame()['frame_time'])
+    finally:
+        engine.close()
+
+    # Summarize per-frame averages.
+    averages = stats.get_averages()
+    return {
+        'scene': scene,
+        'resolution': list(resolution),
+        'mode': 'serial' if num_workers == 0 else 'pool',
+        'workers': num_workers,
+        'frame_mean': averages['frame_time'],
+        'frame_min': min(frame_times),
+        'frame_max': max(frame_times),
+        'stages': averages['stage_times'],
+        'counts': averages['counts'],
+    }
+
+
+def bench_kernels(num_calls=KERNEL_CALLS):
+    # Pair generic functions with their fixed-arity kernels.
+    pairs = (
+        (
+            'dot_h',
+            vector.dot,
+            kernel.dot_h,
+            (KERNEL_VECTOR_H, KERNEL_FOCUS_H,),
+        ),
+        (
+            'subtract_h',
+            vector.subtract,
+            kernel.subtract_h,
+            (KERNEL_VECTOR_H, KERNEL_FOCUS_H,),
+        ),
+        (
+            'distance_h',
+            vector.distance,
+            kernel.distance_h,
+            (KERNEL_VECTOR_H, KERNEL_FOCUS_H,),
+        ),
+        (
+            'project_h',
+            vector.project_h,
+            kernel.project_h,
+            (KERNEL_VECTOR_H, KERNEL_FOCUS_H, KERNEL_PLANE_H,),
+        ),
+        (
+            'normal_3d',
+            polygon.normal_3d,
+            kernel.normal_3d,
+            (KERNEL_TRI_3D,),
+        ),
+        (
+            'tri_aabb_2d',
+            polygon.generate_aabb_2d,
+            kernel.tri_aabb_2d,
+            (KERNEL_TRI_2D,),
+        ),
+        (
+            'tri_contains_point_2d',
+            polygon.poly_contains_point_2d,
+            kernel.tri_contains_point_2d,
+            (KERNEL_TRI_2D, KERNEL_POINT_2D,),
+        ),
+        (
+            'tri_interpolate_2d',
+            polygon.interpolate_attribute_2d,
+            kernel.tri_interpolate_2d,
+            (KERNEL_TRI_2D, (1.0, 2.0, 3.0,), KERNEL_POINT_2D,),
+        ),
+    )
+
+    # Time calls of each, per call.
+    results = {}
+    for name, generic, fast, args in pairs:
+        times = []
+        for function in (generic, fast,):
+            start = time.perf_counter()
+            for call in range(num_calls):
+                function(*args)
+            times.append((time.perf_counter() - start) / num_calls)
+        results[name] = {
+            'generic': times[0],
+            'kernel': times[1],
+            'speedup': times[0] / times[1],
+        }
+
+    return results
+
+
+def _build_scene(
+    engine,
+    scene,
+    resolution,
+    grid_size,
+    num_sprites,
+    lod_levels
+):
+    engine.load_colormap('palette', 'palette.json')
+    instances = []
+    overlay = None
+
+    # Single cube, optionally beneath a heavy overlay.
+    if scene in ('cube', 'overlay',):
+        engine.load_model('cube', 'cube.obj')
+        instances.append(
+            (
+                engine.create_model_instance('cube', 'palette'),
+                (0.0, 0.0, 5.0,),
+                1.0,
+            )
+        )
+        if scene == 'overlay':
+            overlay = [
+                [
+                    '\0' if (x + y) % 2 else '*'
+                    for x
+                    in range(resolution[0])
+                ]
+                for y
+                in range(resolution[1])
+            ]
+
+    # Square grid of small cubes.
+    elif scene == 'cube_grid':
+        engine.load_model('cube', 'cube.obj')
+        side = math.ceil(math.sqrt(grid_size))
+        spacing = 8.0 / side
+        for index in range(grid_size):
+            instances.append(
+                (
+                    engine.create_model_instance('cube', 'palette'),
+                    (
+                        (index % side - (side - 1) / 2) * spacing,
+                        (index // side - (side - 1) / 2) * spacing,
+                        8.0,
+                    ),
+                    spacing * 0.3,
+                )
+            )
+
+    # Wide world of cubes, most of which are outside view.
+    elif scene == 'cube_world':
+        engine.load_model('cube', 'cube.obj')
+        rng = random.Random(0)
+        for index in range(grid_size):
+            instances.append(
+                (
+                    engine.create_model_instance('cube', 'palette'),
+                    (
+                        rng.uniform(-40.0, 40.0),
+                        rng.uniform(-4.0, 4.0),
+                        rng.uniform(-20.0, 20.0),
+                    ),
+                    0.5,
+                )
+            )
+
+    # High-poly sphere.
+    elif scene == 'sphere':
+        engine.load_model('sphere', 'sphere.obj', lod_levels=lod_levels)
+        instances.append(
+            (
+                engine.create_model_instance('sphere', 'palette'),
+                (0.0, 0.0, 4.0,),
+                1.5,
+            )
+        )
+
+    # Scattered sprites.
+    elif scene == 'sprites':
+        engine.load_sprite('sprite', 'sprite.ppm')
+        rng = random.Random(0)
+        for index in range(num_sprites):
+            instances.append(
+                (
+                    engine.create_sprite_instance('sprite', 'palette'),
+                    (
+                        rng.uniform(-4.0, 4.0),
+                        rng.uniform(-4.0, 4.0),
+                        rng.uniform(4.0, 10.0),
+                    ),
+                    0.5,
+                )
+            )
+
+    return instances, overlay
+
+
+def _animate(instances, frame):
+    # Spin and bob every instance about its position.
+    for instance, position, scale in instances:
+        instance.set_transformation(
+            Transformer()
+            .scale(scale)
+            .rotate(0.1 * frame, (0.0, 1.0, 0.0,))
+            .rotate(0.07 * frame, (1.0, 0.0, 0.0,))
+            .translate(
+                (
+                    position[0],
+                    position[1] + 0.1 * math.sin(frame),
+                    position[2],
+                )
+            )
+            .get_transformation()
+        )
+
+
+def _write_resources(resource_dir, sphere_segments):
+    # Colormap resolving every color to its nearest palette color.
+    with open(os.path.join(resource_dir, 'palette.json'), 'w') as f_out:
+        json.dump({'palette': PALETTE}, f_out)
+
+    # Materials, one per cube color.
+    with open(os.path.join(resource_dir, 'bench.mtl'), 'w') as f_out:
+        for index in range(len(CUBE_COLORS)):
+            color = CUBE_COLORS[index]
+            f_out.write(
+                'newmtl m{0}\nKd {1} {2} {3}\n'.format(
+                    index,
+                    int(color[0:2], 16) / 255,
+                    int(color[2:4], 16) / 255,
+                    int(color[4:6], 16) / 255
+                )
+            )
+
+    # Unit cube with one material per pair of opposite faces.
+    with open(os.path.join(resource_dir, 'cube.obj'), 'w') as f_out:
+        f_out.write('mtllib bench.mtl\n')
+        for x in (-1.0, 1.0,):
+            for y in (-1.0, 1.0,):
+                for z in (-1.0, 1.0,):
+                    f_out.write('v {0} {1} {2}\n'.format(x, y, z))
+        for material, face in (
+            (0, (1, 2, 4, 3,),),
+            (0, (5, 7, 8, 6,),),
+            (1, (1, 5, 6, 2,),),
+            (1, (3, 4, 8, 7,),),
+            (2, (1, 3, 7, 5,),),
+            (2, (2, 6, 8, 4,),),
+        ):
+            f_out.write(
+                'usemtl m{0}\nf {1} {2} {3} {4}\n'.format(material, *face)
+            )
+
+    # Latitude-longitude sphere, alternating materials per band.
+    rings = max(sphere_segments // 2, 2)
+    with open(os.path.join(resource_dir, 'sphere.obj'), 'w') as f_out:
+        f_out.write('mtllib bench.mtl\n')
+        for ring in range(rings + 1):
+            theta = math.pi * ring / rings
+            for segment in range(sphere_segments):
+                phi = 2.0 * math.pi * segment / sphere_segments
+                f_out.write(
+                    'v {0} {1} {2}\n'.format(
+                        math.sin(theta) * math.cos(phi),
+                        math.cos(theta),
+                        math.sin(theta) * math.sin(phi)
+                    )
+                )
+        for ring in range(rings):
+            f_out.write('usemtl m{0}\n'.format(ring % len(CUBE_COLORS)))
+            for segment in range(sphere_segments):
+                top = ring * sphere_segments + 1
+                bottom = top + sphere_segments
+                next_segment = (segment + 1) % sphere_segments
+                f_out.write(
+                    'f {0} {1} {2} {3}\n'.format(
+                        top + segment,
+                        top + next_segment,
+                        bottom + next_segment,
+                        bottom + segment
+                    )
+                )
+
+    # Gradient sprite exercising nearest-color lookups.
+    size = 16
+    with open(os.path.join(resource_dir, 'sprite.ppm'), 'wb') as f_out:
+        f_out.write('P6\n{0} {0}\n255\n'.format(size).encode('ascii'))
+        f_out.write(
+            bytes(
+                component
+                for y
+                in range(size)
+                for x
+                in range(size)
+                for component
+                in (x * 255 // size, y * 255 // size, 128,)
+            )
+        )
+
+
+def _parse_resolution(value):
+    try:
+        width, height = value.lower().split('x')
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            'invalid resolution: {0}'.format(value)
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,9 @@ AXIS_NORMALS = (
     (0.0, 1.0, 0.0,),
     (0.0, 0.0, 1.0,),
 )
+BOX_INSIDE = 2
+BOX_INTERSECT = 1
+BOX_OUTSIDE = 0
 PLANE_NORMAL = 1
 PLANE_POINT = 0
 X = 0
@@ -0,0 +1,280 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+import math
+from rendascii.geometry import PLANE_NORMAL, PLANE_POINT
+from rendascii.geometry import X, Y, Z, W
+from sys import float_info
+
+
+# Fixed-arity, unrolled counterparts of the generic vector and polygon
+# functions. Each performs the same operations in the same order, so that
+# results are identical. Sums accumulate left to right from zero, as sum
+# does.
+
+
+# 2D kernels.
+
+def add_2d(vec_a, vec_b):
+    return (
+        vec_a[X] + vec_b[X],
+        vec_a[Y] + vec_b[Y],
+    )
+
+
+def subtract_2d(vec_b, vec_a):
+    return (
+        vec_b[X] - vec_a[X],
+        vec_b[Y] - vec_a[Y],
+    )
+
+
+def multiply_2d(vec, scalar):
+    return (
+        vec[X] * scalar,
+        vec[Y] * scalar,
+    )
+
+
+def dot_2d(vec_a, vec_b):
+    return 0.0 + vec_a[X] * vec_b[X] + vec_a[Y] * vec_b[Y]
+
+
+def distance_2d(vec_b, vec_a):
+    x = vec_b[X] - vec_a[X]
+    y = vec_b[Y] - vec_a[Y]
+    return math.sqrt(0.0 + x * x + y * y)
+
+
+def tri_aabb_2d(tri):
+    # Unpack triangle.
+    (
+        (x0, y0),
+        (x1, y1),
+        (x2, y2)
+    ) = tri
+
+    # Same comparisons as polygon.generate_aabb_2d.
+    min_x = max_x = x0
+    min_y = max_y = y0
+    if x1 < min_x:
+        min_x = x1
+    if x1 > max_x:
+        max_x = x1
+    if y1 < min_y:
+        min_y = y1
+    if y1 > max_y:
+        max_y = y1
+    if x2 < min_x:
+        min_x = x2
+    if x2 > max_x:
+        max_x = x2
+    if y2 < min_y:
+        min_y = y2
+    if y2 > max_y:
+        max_y = y2
+
+    return (
+        (min_x, min_y,),
+        (max_x, max_y,),
+    )
+
+
+def edge_2d(vec, line_s, line_e):
+    return (
+        (vec[X] - line_e[X]) * (line_s[Y] - line_e[Y])
+        - (line_s[X] - line_e[X]) * (vec[Y] - line_e[Y])
+    )
+
+
+def tri_contains_point_2d(tri, point):
+    # Unpack point and triangle.
+    p_x, p_y = point
+    (
+        (x0, y0),
+        (x1, y1),
+        (x2, y2)
+    ) = tri
+
+    # Fused edge functions of polygon.poly_contains_point_2d.
+    start = (p_x - x0) * (y2 - y0) - (x2 - x0) * (p_y - y0) <= 0
+    return (
+        (((p_x - x1) * (y0 - y1) - (x0 - x1) * (p_y - y1)) <= 0) == start
+        and (((p_x - x2) * (y1 - y2) - (x1 - x2) * (p_y - y2)) <= 0) == start
+    )
+
+
+def tri_interpolate_2d(tri, attributes, point):
+    # Unpack point and triangle.
+    p_x, p_y = point
+    (
+        (x0, y0),
+        (x1, y1),
+        (x2, y2)
+    ) = tri
+
+    # Fused double areas of polygon.interpolate_attribute_2d.
+    area_t = x0 * y1 + x1 * y2 + x2 * y0 - x0 * y2 - x2 * y1 - x1 * y0
+    if area_t < 0:
+        area_t = -area_t
+    area_0 = p_x * y1 + x1 * y2 + x2 * p_y - p_x * y2 - x2 * y1 - x1 * p_y
+    if area_0 < 0:
+        area_0 = -area_0
+    area_1 = p_x * y2 + x2 * y0 + x0 * p_y - p_x * y0 - x0 * y2 - x2 * p_y
+    if area_1 < 0:
+        area_1 = -area_1
+    area_2 = p_x * y0 + x0 * y1 + x1 * p_y - p_x * y1 - x1 * y0 - x0 * p_y
+    if area_2 < 0:
+        area_2 = -area_2
+
+    return (
+        area_0 / area_t * attributes[0]
+        + area_1 / area_t * attributes[1]
+        + area_2 / area_t * attributes[2]
+    )
+
+
+# 3D kernels.
+
+def add_3d(vec_a, vec_b):
+    return (
+        vec_a[X] + vec_b[X],
+        vec_a[Y] + vec_b[Y],
+        vec_a[Z] + vec_b[Z],
+    )
+
+
+def subtract_3d(vec_b, vec_a):
+    return (
+        vec_b[X] - vec_a[X],
+        vec_b[Y] - vec_a[Y],
+        vec_b[Z] - vec_a[Z],
+    )
+
+
+def multiply_3d(vec, scalar):
+    return (
+        vec[X] * scalar,
+        vec[Y] * scalar,
+        vec[Z] * scalar,
+    )
+
+
+def dot_3d(vec_a, vec_b):
+    return (
+        0.0 + vec_a[X] * vec_b[X] + vec_a[Y] * vec_b[Y] + vec_a[Z] * vec_b[Z]
+    )
+
+
+def distance_3d(vec_b, vec_a):
+    x = vec_b[X] - vec_a[X]
+    y = vec_b[Y] - vec_a[Y]
+    z = vec_b[Z] - vec_a[Z]
+    return math.sqrt(0.0 + x * x + y * y + z * z)
+
+
+def normal_3d(poly):
+    # Fused cross product of edges of polygon.normal_3d.
+    v0 = poly[0]
+    v1 = poly[1]
+    v2 = poly[2]
+    a_x = v1[X] - v0[X]
+    a_y = v1[Y] - v0[Y]
+    a_z = v1[Z] - v0[Z]
+    b_x = v2[X] - v0[X]
+    b_y = v2[Y] - v0[Y]
+    b_z = v2[Z] - v0[Z]
+    return (
+        a_y * b_z - a_z * b_y,
+        a_z * b_x - a_x * b_z,
+        a_x * b_y - a_y * b_x,
+    )
+
+
+# Homogeneous kernels.
+
+def add_h(vec_a, vec_b):
+    return (
+        vec_a[X] + vec_b[X],
+        vec_a[Y] + vec_b[Y],
+        vec_a[Z] + vec_b[Z],
+        vec_a[W] + vec_b[W],
+    )
+
+
+def subtract_h(vec_b, vec_a):
+    return (
+        vec_b[X] - vec_a[X],
+        vec_b[Y] - vec_a[Y],
+        vec_b[Z] - vec_a[Z],
+        vec_b[W] - vec_a[W],
+    )
+
+
+def multiply_h(vec, scalar):
+    return (
+        vec[X] * scalar,
+        vec[Y] * scalar,
+        vec[Z] * scalar,
+        vec[W] * scalar,
+    )
+
+
+def dot_h(vec_a, vec_b):
+    return (
+        0.0
+        + vec_a[X] * vec_b[X]
+        + vec_a[Y] * vec_b[Y]
+        + vec_a[Z] * vec_b[Z]
+        + vec_a[W] * vec_b[W]
+    )
+
+
+def distance_h(vec_b, vec_a):
+    x = vec_b[X] - vec_a[X]
+    y = vec_b[Y] - vec_a[Y]
+    z = vec_b[Z] - vec_a[Z]
+    w = vec_b[W] - vec_a[W]
+    return math.sqrt(0.0 + x * x + y * y + z * z + w * w)
+
+
+def plane_distance_h(vec, plane):
+    # Fused dot product of plane normal with vector relative to plane.
+    normal = plane[PLANE_NORMAL]
+    point = plane[PLANE_POINT]
+    return (
+        0.0
+        + normal[X] * (vec[X] - point[X])
+        + normal[Y] * (vec[Y] - point[Y])
+        + normal[Z] * (vec[Z] - point[Z])
+        + normal[W] * (vec[W] - point[W])
+    )
+
+
+def project_h(vec, focus, plane):
+    # Fused vector.project_h.
+    normal = plane[PLANE_NORMAL]
+    u_x = vec[X] - focus[X]
+    u_y = vec[Y] - focus[Y]
+    u_z = vec[Z] - focus[Z]
+    u_w = vec[W] - focus[W]
+    direction = (
+        0.0
+        + normal[X] * u_x
+        + normal[Y] * u_y
+        + normal[Z] * u_z
+        + normal[W] * u_w
+    )
+    # Handle potential division by zero.
+    if direction == 0.0:
+        direction = float_info.min
+    ratio = -plane_distance_h(focus, plane) / direction
+    return (
+        focus[X] + u_x * ratio,
+        focus[Y] + u_y * ratio,
+        focus[Z] + u_z * ratio,
+        focus[W] + u_w * ratio,
+    )
@@ -7,6 +7,11 @@ See file LICENSE.txt for full license details.
 import math
 from rendascii.geometry import X, Y, Z
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 IDENTITY_H = (
     (1.0, 0.0, 0.0, 0.0,),
@@ -14,11 +19,15 @@ IDENTITY_H = (
     (0.0, 0.0, 1.0, 0.0,),
     (0.0, 0.0, 0.0, 1.0,),
 )
+NUMPY_MIN_VECTORS = 64
 
 
 # Common matrix functions.
 
 def compose(matrix_a, matrix_b):
+    if len(matrix_a[0]) == 4 and len(matrix_b) == 4 and len(matrix_b[0]) == 4:
+        return _compose_4x4(matrix_a, matrix_b)
+
     return tuple(
         tuple(
             sum(
@@ -36,6 +45,15 @@ def compose(matrix_a, matrix_b):
     )
 
 
+def compose_many(matrices):
+    # Compose right to left, as nested calls to compose would.
+    composition = matrices[-1]
+    for m in range(len(matrices) - 2, -1, -1):
+        composition = compose(matrices[m], composition)
+
+    return composition
+
+
 def transpose(matrix):
     return tuple(
         tuple(
@@ -51,6 +69,9 @@ def transpose(matrix):
 # Homogeneous matrix functions.
 
 def transform_h(matrix, vec):
+    if len(matrix) == 4 and len(vec) == 4:
+        return _transform_4x4(matrix, vec)
+
     return tuple(
         sum(
             tuple(
@@ -64,6 +85,51 @@ def transform_h(matrix, vec):
     )
 
 
+def transform_many_h(matrix, vecs):
+    # Vectorize large buffers if possible.
+    if numpy is not None and len(vecs) >= NUMPY_MIN_VECTORS:
+        return _transform_numpy(matrix, numpy.asarray(vecs, numpy.float64))
+
+    return tuple(
+        _transform_4x4(matrix, vec)
+        for vec
+        in vecs
+    )
+
+
+def transform_points_h(matrix, points, flat=False):
+    # Transform 3D points as homogeneous vectors with a W of one, given
+    # either as triplets or as a flat sequence of them.
+    num_points = len(points) // 3 if flat else len(points)
+    if numpy is not None and num_points >= NUMPY_MIN_VECTORS:
+        return _transform_numpy(
+            matrix,
+            numpy.asarray(points, numpy.float64).reshape(num_points, 3)
+        )
+
+    # Unpack matrix rows.
+    (
+        (m00, m01, m02, m03,),
+        (m10, m11, m12, m13,),
+        (m20, m21, m22, m23,),
+        (m30, m31, m32, m33,),
+    ) = matrix
+
+    if flat:
+        points = zip(points[0::3], points[1::3], points[2::3])
+
+    return tuple(
+        (
+            0.0 + m00 * x + m01 * y + m02 * z + m03,
+            0.0 + m10 * x + m11 * y + m12 * z + m13,
+            0.0 + m20 * x + m21 * y + m22 * z + m23,
+            0.0 + m30 * x + m31 * y + m32 * z + m33,
+        )
+        for x, y, z
+        in points
+    )
+
+
 def scaling_h(scalar):
     return (
         (scalar, 0.0, 0.0, 0.0,),
@@ -106,3 +172,60 @@ def projection_h(near, far, fov, ratio):
         (0.0, 0.0, far / d, -far * near / d,),
         (0.0, 0.0, 1.0, 0.0,),
     )
+
+
+# Helper functions.
+
+# Unrolled products accumulate left to right from zero, like sum, so that
+# they match the generic functions exactly.
+
+def _compose_4x4(matrix_a, matrix_b):
+    # Unpack matrix columns.
+    (
+        (b00, b01, b02, b03,),
+        (b10, b11, b12, b13,),
+        (b20, b21, b22, b23,),
+        (b30, b31, b32, b33,),
+    ) = matrix_b
+
+    return tuple(
+        (
+            0.0 + a0 * b00 + a1 * b10 + a2 * b20 + a3 * b30,
+            0.0 + a0 * b01 + a1 * b11 + a2 * b21 + a3 * b31,
+            0.0 + a0 * b02 + a1 * b12 + a2 * b22 + a3 * b32,
+            0.0 + a0 * b03 + a1 * b13 + a2 * b23 + a3 * b33,
+        )
+        for a0, a1, a2, a3
+        in matrix_a
+    )
+
+
+def _transform_4x4(matrix, vec):
+    # Unpack vector.
+    (
+        x,
+        y,
+        z,
+        w
+    ) = vec
+
+    return tuple(
+        0.0 + m0 * x + m1 * y + m2 * z + m3 * w
+        for m0, m1, m2, m3
+        in matrix
+    )
+
+
+def _transform_numpy(matrix, vectors):
+    # Apply each row to whole columns, which rounds as the unrolled
+    # functions do. Points (Nx3) have an implicit W of one.
+    columns = vectors.T
+    out_vectors = numpy.empty((len(vectors), 4,))
+    for i in range(4):
+        row = matrix[i]
+        out_column = 0.0 + row[0] * columns[X] + row[1] * columns[Y]
+        out_column += row[2] * columns[Z]
+        out_column += row[3] if len(columns) == 3 else row[3] * columns[3]
+        out_vectors[:, i] = out_column
+
+    return tuple(map(tuple, out_vectors.tolist()))
@@ -4,8 +4,8 @@ See file LICENSE.txt for full license details.
 """
 
 
-from rendascii.geometry import vector
-from rendascii.geometry import PLANE_NORMAL, PLANE_POINT
+from rendascii.geometry import kernel, vector
+from rendascii.geometry import BOX_INSIDE, BOX_INTERSECT, BOX_OUTSIDE
 from rendascii.geometry import X, Y
 
 
@@ -82,15 +82,7 @@ def f_cull_h(poly, plane):
     inside = []
     outside = []
     for v in range(len(poly)):
-        if (
-            vector.dot(
-                plane[PLANE_NORMAL],
-                vector.subtract(
-                    poly[v],
-                    plane[PLANE_POINT]
-                )
-            ) < 0.0
-        ):
+        if kernel.plane_distance_h(poly[v], plane) < 0.0:
             outside.append(v)
         else:
             inside.append(v)
@@ -110,6 +102,24 @@ def f_cull_h(poly, plane):
     return out_polys
 
 
+def classify_box_h(corners, planes):
+    # Box is outside if all corners are outside any one plane, since
+    # everything within it is then culled by that plane, and inside if all
+    # corners are inside every plane.
+    classification = BOX_INSIDE
+    for plane in planes:
+        num_outside = 0
+        for corner in corners:
+            if kernel.plane_distance_h(corner, plane) < 0.0:
+                num_outside += 1
+        if num_outside == len(corners):
+            return BOX_OUTSIDE
+        if num_outside > 0:
+            classification = BOX_INTERSECT
+
+    return classification
+
+
 # Helper functions.
 
 def _f_cull_1(poly, plane, inside, outside):
@@ -120,12 +130,12 @@ def _f_cull_1(poly, plane, inside, outside):
     i0 = inside[0]
     i1 = inside[1]
     o0 = outside[0]
-    p0 = vector.project_h(
+    p0 = kernel.project_h(
         poly[i0],
         poly[o0],
         plane
     )
-    p1 = vector.project_h(
+    p1 = kernel.project_h(
         poly[i1],
         poly[o0],
         plane
@@ -151,12 +161,12 @@ def _f_cull_2(poly, plane, inside, outside):
     i0 = inside[0]
     o0 = outside[0]
     o1 = outside[1]
-    p0 = vector.project_h(
+    p0 = kernel.project_h(
         poly[i0],
         poly[o0],
         plane
     )
-    p1 = vector.project_h(
+    p1 = kernel.project_h(
         poly[i0],
         poly[o1],
         plane
@@ -4,12 +4,18 @@ See file LICENSE.txt for full license details.
 """
 
 
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 import math
-from multiprocessing import Pool
-from rendascii import resource
-from rendascii.geometry import X, Y
-from rendascii.geometry import matrix
-from rendascii.pipeline import stage
+from multiprocessing import Barrier, Pool
+import pickle
+import time
+import weakref
+from rendascii import resource, spatial
+from rendascii.geometry import BOX_OUTSIDE, W, X, Y, Z
+from rendascii.geometry import matrix, polygon
+from rendascii.pipeline import raster, shared, stage
+from rendascii.pipeline import RASTER_FRAGMENT, RASTER_NUMPY, RASTER_SCANLINE
 
 
 class Engine:
@@ -19,20 +25,96 @@ class Engine:
         sprite_dir='',
         model_dir='',
         material_dir='',
-        num_workers=0
+        num_workers=0,
+        rasterizer=RASTER_FRAGMENT,
+        tile_size=8,
+        chunk_size=None,
+        instance_cache=True,
+        stats=None,
+        spatial_index=False
     ):
+        # Validate rasterizer.
+        if rasterizer not in (
+            RASTER_FRAGMENT,
+            RASTER_NUMPY,
+            RASTER_SCANLINE,
+        ):
+            raise ValueError('Unknown rasterizer: {0}'.format(rasterizer))
+        if rasterizer == RASTER_NUMPY and not raster.numpy_available():
+            raise ImportError('NumPy rasterizer requires NumPy')
+
+        # Validate tile size.
+        if type(tile_size) is not int or tile_size < 1:
+            raise ValueError('Invalid tile size: {0}'.format(tile_size))
+
+        # Validate chunk size, None sizing chunks automatically.
+        if chunk_size is not None and (
+            type(chunk_size) is not int or chunk_size < 1
+        ):
+            raise ValueError('Invalid chunk size: {0}'.format(chunk_size))
+
         # Initialize instance attributes.
         self._cameras = []
         self._colormaps = {}
         self._models = {}
-        self._model_instances = []
+        self._model_refs = {}
+        self._model_corners = {}
+        self._model_lods = {}
+        self._model_materials = {}
+        self._model_segments = {}
+        self._model_generation = 0
+        self._model_instances = {}
         self._sprites = {}
-        self._sprite_instances = []
+        self._sprite_instances = {}
         self._colormap_dir = self._format_resource_dir(colormap_dir)
         self._sprite_dir = self._format_resource_dir(sprite_dir)
         self._model_dir = self._format_resource_dir(model_dir)
         self._material_dir = self._format_resource_dir(material_dir)
-        self._workers = Pool(num_workers) if num_workers > 0 else None
+        self._workers = None
+        if num_workers > 0:
+            shared.initialize()
+            self._workers = Pool(
+                num_workers,
+                shared.initialize_worker,
+                (Barrier(num_workers),)
+            )
+            weakref.finalize(
+                self,
+                _release_segments,
+                self._model_segments
+            )
+        self._rasterizer = rasterizer
+        self._tile_size = tile_size
+        self._chunk_size = chunk_size
+        self._instance_cache = instance_cache
+        self._num_workers = max(num_workers, 1)
+        self._stats = stats
+        self._executor = None
+        self._camera_executor = None
+        self._instance_index = None
+        if spatial_index:
+            self._instance_index = spatial.LooseOctree()
+
+    def close(self):
+        # Finish frames rendering in background.
+        for executor in (self._executor, self._camera_executor,):
+            if executor is not None:
+                executor.shutdown()
+        self._executor = None
+        self._camera_executor = None
+
+        # Stop workers and release models resident to them.
+        if self._workers is not None:
+            self._workers.terminate()
+            self._workers = None
+            _release_segments(self._model_segments)
+            self._model_refs.clear()
+
+    def set_stats(self, stats):
+        self._stats = stats
+
+    def get_stats(self):
+        return self._stats
 
     def create_camera(
         self,
@@ -42,9 +124,19 @@ class Engine:
         fov=math.radians(70),
         ratio=1.0,
         fog_char=' ',
-        culling=True
+        culling=True,
+        incremental=False
     ):
-        camera = Camera(resolution, near, far, fov, ratio, fog_char, culling)
+        camera = Camera(
+            resolution,
+            near,
+            far,
+            fov,
+            ratio,
+            fog_char,
+            culling,
+            incremental
+        )
         self._cameras.append(camera)
         return camera
 
@@ -74,85 +166,338 @@ class Engine:
     def unload_sprite(self, sprite_name):
         del self._sprites[sprite_name]
 
-    def load_model(self, model_name, model_filename, right_handed=False):
-        self._models[model_name] = resource.load_model(
-            model_filename,
-            self._model_dir,
-            self._material_dir,
-            right_handed
+    def load_model(
+        self,
+        model_name,
+        model_filename,
+        right_handed=False,
+        compact=False,
+        compiled=False,
+        lod_filenames=(),
+        lod_levels=0,
+        lod_size=32
+    ):
+        # Load model with coarser levels of detail, then generate further
+        # levels by decimating the coarsest one.
+        models = [
+            resource.load_model(
+                filename,
+                self._model_dir,
+                self._material_dir,
+                right_handed,
+                compact,
+                compiled
+            )
+            for filename
+            in (model_filename,) + tuple(lod_filenames)
+        ]
+        for level in range(lod_levels):
+            model = resource.decimate_model(models[-1])
+            if resource.model_size(model)[1] == 0:
+                break
+            models.append(model)
+        self._models[model_name] = models[0]
+        self._model_lods[model_name] = (tuple(models), lod_size,)
+
+        # Index face colors of every level into material color tables, so
+        # that polygons are colormapped by index.
+        self._model_materials[model_name] = tuple(
+            map(resource.index_model_colors, models)
+        )
+
+        # Precompute bounding box corners for frustum culling instances,
+        # bounding every level of detail.
+        level_bounds = tuple(
+            bounds
+            for bounds
+            in map(resource.model_bounds, models)
+            if bounds is not None
         )
+        self._model_corners[model_name] = None
+        if len(level_bounds) > 0:
+            bounds = (
+                tuple(
+                    min(bounds[0][axis] for bounds in level_bounds)
+                    for axis
+                    in (X, Y, Z,)
+                ),
+                tuple(
+                    max(bounds[1][axis] for bounds in level_bounds)
+                    for axis
+                    in (X, Y, Z,)
+                ),
+            )
+            self._model_corners[model_name] = tuple(
+                (x, y, z, 1.0,)
+                for x
+                in (bounds[0][X], bounds[1][X],)
+                for y
+                in (bounds[0][Y], bounds[1][Y],)
+                for z
+                in (bounds[0][Z], bounds[1][Z],)
+            )
+
+        # Reindex instances of model, since their bounds have changed.
+        if self._instance_index is not None:
+            for instance in self._model_instances:
+                if instance._resource_name == model_name:
+                    self._index_model_instance(instance)
+
+        # Make model vertices resident to workers.
+        if self._workers is not None:
+            self._release_model(model_name)
+            self._model_generation += 1
+            segments = []
+            refs = []
+            for level in range(len(models)):
+                vertices = models[level][0]
+                # Mapped compiled models must be copied to be serialized.
+                if type(vertices) is memoryview:
+                    vertices = array(vertices.format, vertices.tobytes())
+                segment, handle = shared.publish(vertices)
+                segments.append(segment)
+                refs.append(
+                    (
+                        (model_name, level,),
+                        self._model_generation,
+                        handle,
+                    )
+                )
+            self._model_segments[model_name] = tuple(segments)
+            self._model_refs[model_name] = tuple(refs)
 
     def unload_model(self, model_name):
         del self._models[model_name]
+        del self._model_lods[model_name]
+        del self._model_corners[model_name]
+        del self._model_materials[model_name]
+        self._release_model(model_name)
 
     def create_sprite_instance(self, sprite_name, colormap_name):
         sprite_instance = SpriteInstance(sprite_name, colormap_name)
-        self._sprite_instances.append(sprite_instance)
+        # Instances are keys of insertion-ordered dictionaries, so that they
+        # are deleted in constant time yet rendered in creation order.
+        self._sprite_instances[sprite_instance] = None
         return sprite_instance
 
     def delete_sprite_instance(self, sprite_instance):
-        self._sprite_instances = [
-            instance
-            for instance
-            in self._sprite_instances
-            if instance is not sprite_instance
-        ]
+        self._sprite_instances.pop(sprite_instance, None)
 
     def create_model_instance(self, model_name, colormap_name):
         model_instance = ModelInstance(model_name, colormap_name)
-        self._model_instances.append(model_instance)
+        self._model_instances[model_instance] = None
+        if self._instance_index is not None:
+            model_instance._reindex = self._index_model_instance
+            self._index_model_instance(model_instance)
         return model_instance
 
     def delete_model_instance(self, model_instance):
-        self._model_instances = [
-            instance
-            for instance
-            in self._model_instances
-            if instance is not model_instance
-        ]
+        if model_instance in self._model_instances:
+            del self._model_instances[model_instance]
+            if self._instance_index is not None:
+                self._instance_index.remove(model_instance)
+                model_instance._reindex = None
 
     def render_frame(self, camera, overlay=None, as_str=False):
+        # Finish in order behind frames rendering in background.
+        if self._executor is not None:
+            return self.render_frame_async(camera, overlay, as_str).result()
+
+        return self._finish_frame(
+            self._prepare_frame(camera, overlay, as_str, {})
+        )
+
+    def render_frames(self, cameras, overlays=None, as_str=False):
+        # Seed every camera from one scene snapshot, sharing colormapped
+        # polygons among them.
+        textures = {}
+        frame_data = tuple(
+            self._prepare_frame(
+                cameras[c],
+                None if overlays is None else overlays[c],
+                as_str,
+                textures
+            )
+            for c
+            in range(len(cameras))
+        )
+
+        # Finish in order behind frames rendering in background.
+        if self._executor is not None:
+            return self._executor.submit(
+                self._finish_frames,
+                frame_data
+            ).result()
+
+        return self._finish_frames(frame_data)
+
+    def render_frame_async(self, camera, overlay=None, as_str=False):
+        # Snapshot scene state now, then finish frame in background.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+
+        return self._executor.submit(
+            self._finish_frame,
+            self._prepare_frame(camera, overlay, as_str, {})
+        )
+
+    def _prepare_frame(self, camera, overlay, as_str, textures):
+        # Time seeding only if statistics are enabled.
+        stats = self._stats
+        if stats is not None:
+            start = time.perf_counter()
+
         # Prepare overlay.
+        clear_overlay = tuple(
+            '\0'
+            for fragment
+            in range(len(camera._fragments))
+        )
         flat_overlay = (
-            tuple(
-                '\0'
-                for fragment
-                in range(len(camera._fragments))
-            )
+            clear_overlay
             if overlay is None
             else sum(overlay, [])
             if type(overlay[0]) is list
             else sum(overlay, ())
         )
 
-        # Pass data through pipeline to generate pixel fragments.
-        out_data = (
-            stage.stage_three(
-                stage.sync_two(
-                    stage.stage_two(
-                        stage.sync_one(
-                            stage.stage_one(
-                                self._seed_pipeline(camera, flat_overlay)
-                            )
-                        )
-                    )
-                )
-            )
+        # Incremental cameras composite their overlay after rasterization.
+        seed_overlay = clear_overlay if camera._incremental else flat_overlay
+
+        # Seed pipeline, skipping work cached by model instances. Seed data
+        # and instance states snapshot the scene, so that it may change
+        # while the frame is finished.
+        plan = self._plan_model_instances(camera)
+        seed_data = self._seed_pipeline(camera, seed_overlay, plan, textures)
+        instance_states = None
+        if camera._incremental:
+            instance_states = self._gen_instance_states()
+
+        # Pack frame data.
+        return (
+            camera,
+            camera._generation,
+            camera._transformation,
+            tuple(flat_overlay),
+            as_str,
+            plan,
+            seed_data,
+            instance_states,
+            0.0 if stats is None else time.perf_counter() - start,
         )
 
-        # Unpack output data.
+    def _finish_frames(self, frame_data):
+        # Finish cameras concurrently, so that workers serve them in
+        # parallel. Repeated cameras share state, so they finish in order.
+        cameras = set(camera_data[0] for camera_data in frame_data)
+        if self._workers is None or len(cameras) != len(frame_data):
+            return tuple(
+                self._finish_frame(camera_data)
+                for camera_data
+                in frame_data
+            )
+        if self._camera_executor is None:
+            self._camera_executor = ThreadPoolExecutor()
+
+        return tuple(self._camera_executor.map(self._finish_frame, frame_data))
+
+    def _finish_frame(self, frame_data):
+        # Unpack frame data.
         (
-            workers,
-            out_vertex_data,
-            out_polygon_data,
-            out_sprite_data,
-            out_fragment_data
-        ) = out_data
+            camera,
+            generation,
+            transformation,
+            flat_overlay,
+            as_str,
+            plan,
+            in_data,
+            instance_states,
+            seed_time
+        ) = frame_data
+
+        # Record frame statistics only if enabled.
+        render_stats = self._stats
+        stats = None
+        if render_stats is not None:
+            stats = render_stats._begin_frame(seed_time)
+
+        # Pass data through pipeline to generate polygon and sprite data.
+        out_data = stage.stage_one(
+            in_data,
+            self._chunk_size,
+            self._num_workers
+        )
+        if stats is not None:
+            self._record_stage(stats, 'stage_one', in_data, out_data)
+        instance_sprite_data = out_data[3]
+        in_data = stage.sync_one(self._reuse_model_instances(plan, out_data))
+        if stats is not None:
+            self._record_stage(stats, 'sync_one', out_data, in_data)
+        out_data = stage.stage_two(
+            in_data,
+            self._chunk_size,
+            self._num_workers
+        )
+        if stats is not None:
+            self._record_stage(stats, 'stage_two', in_data, out_data)
+        in_data = self._merge_model_instances(
+            camera,
+            generation,
+            plan,
+            out_data
+        )
+        instance_polygon_data = in_data[2]
+        out_data = stage.sync_two(in_data)
+        if stats is not None:
+            self._record_stage(stats, 'sync_two', in_data, out_data)
+
+        # Determine which fragments to rasterize.
+        fragment_ranges = (
+            (0, camera._resolution[X], 0, camera._resolution[Y],),
+        )
+        frame_chars = [None] * len(camera._fragments)
+        if camera._incremental:
+            dirty_ranges = self._gen_dirty_ranges(
+                camera,
+                transformation,
+                instance_states,
+                plan,
+                instance_polygon_data,
+                instance_sprite_data
+            )
+            # Reuse previous frame outside of dirty fragment ranges.
+            if camera._last_frame is not None and dirty_ranges is not None:
+                fragment_ranges = dirty_ranges
+                frame_chars = camera._last_frame
+
+        # Pass data through pipeline to generate pixel fragments.
+        for fragment_range in fragment_ranges:
+            self._rasterize(
+                camera,
+                out_data,
+                fragment_range,
+                frame_chars,
+                stats
+            )
+        if stats is not None:
+            stats.lap('stage_three')
+
+        # Composite overlay onto incrementally rendered frame.
+        out_fragment_data = frame_chars
+        if camera._incremental:
+            camera._last_frame = frame_chars
+            out_fragment_data = [
+                flat_overlay[fragment]
+                if flat_overlay[fragment] != '\0'
+                else frame_chars[fragment]
+                for fragment
+                in range(len(frame_chars))
+            ]
 
         # Reshape fragment data to camera resolution.
         frame = tuple(
             tuple(
-                out_fragment_data[y * camera._resolution[X] + x][0]
+                out_fragment_data[y * camera._resolution[X] + x]
                 for x
                 in range(camera._resolution[X])
             )
@@ -172,6 +517,14 @@ class Engine:
                 )
             )
 
+        # Finish recording frame statistics.
+        if stats is not None:
+            stats.lap('assemble')
+            render_stats._end_frame(stats)
+
+        # Swap completed frame to front.
+        camera._front_frame = frame
+
         return frame
 
     def _format_resource_dir(self, resource_dir):
@@ -180,9 +533,265 @@ class Engine:
             new_dir += '/'
         return new_dir
 
-    def _seed_pipeline(self, camera, overlay):
+    def _release_model(self, model_name):
+        if model_name in self._model_segments:
+            segments = self._model_segments.pop(model_name)
+            refs = self._model_refs.pop(model_name)
+            # Frames rendering in background may still read segments.
+            if self._executor is None:
+                self._release_resident(segments, refs)
+            else:
+                self._executor.submit(self._release_resident, segments, refs)
+
+    def _release_resident(self, segments, refs):
+        # Evict resident data from every worker, then release its segments.
+        self._workers.map(
+            shared.evict_resident,
+            (tuple(ref[0] for ref in refs),) * self._num_workers,
+            1
+        )
+        for segment in segments:
+            shared.release(segment)
+
+    def _index_model_instance(self, instance):
+        # Bound instance by its model's bounding box in world space.
+        bounds = None
+        corners = self._model_corners.get(instance._resource_name)
+        if corners is not None:
+            world_corners = matrix.transform_many_h(
+                instance._transformation,
+                corners
+            )
+            bounds = (
+                tuple(
+                    min(corner[axis] for corner in world_corners)
+                    for axis
+                    in (X, Y, Z,)
+                ),
+                tuple(
+                    max(corner[axis] for corner in world_corners)
+                    for axis
+                    in (X, Y, Z,)
+                ),
+            )
+
+        if instance in self._instance_index:
+            self._instance_index.update(instance, bounds)
+        else:
+            self._instance_index.insert(instance, bounds)
+
+    def _gen_instance_states(self):
+        return (
+            tuple(
+                (
+                    instance,
+                    instance._gen_state(self._models, self._colormaps),
+                )
+                for instance
+                in self._model_instances
+            ),
+            tuple(
+                (
+                    instance,
+                    instance._gen_state(self._sprites, self._colormaps),
+                )
+                for instance
+                in self._sprite_instances
+            ),
+        )
+
+    def _gen_dirty_ranges(
+        self,
+        camera,
+        transformation,
+        instance_states,
+        plan,
+        polygon_data,
+        sprite_data
+    ):
+        # Unpack instance states seeded from.
+        (
+            model_states,
+            sprite_states
+        ) = instance_states
+
+        # Gather screen-space AABBs of planned model instances.
+        model_aabbs = {}
+        polygon_offset = 0
+        for (
+            instance,
+            instance_transformation,
+            model,
+            level,
+            colormap,
+            clip_vertices,
+            cached_polygon_data
+        ) in plan:
+            num_polygons = (
+                resource.model_size(model)[1]
+                if cached_polygon_data is None
+                else len(cached_polygon_data)
+            )
+            corners = tuple(
+                corner
+                for packets
+                in polygon_data[polygon_offset:polygon_offset + num_polygons]
+                for polygon_packet
+                in packets
+                for corner
+                in polygon_packet[3]
+            )
+            if len(corners) > 0:
+                model_aabbs[instance] = polygon.generate_aabb_2d(corners)
+            polygon_offset += num_polygons
+
+        # Gather instance states and screen-space AABBs.
+        instances = {}
+        for instance, state in model_states:
+            instances[instance] = (state, model_aabbs.get(instance),)
+        sprite_offset = 0
+        for instance, state in sprite_states:
+            aabb = None
+            if not state[0]:
+                if sprite_data[sprite_offset] is not None:
+                    aabb = sprite_data[sprite_offset][2]
+                sprite_offset += 1
+            instances[instance] = (state, aabb,)
+
+        # Collect AABBs of changed, created and deleted instances.
+        aabbs = []
+        for instance in instances:
+            state, aabb = instances[instance]
+            if instance in camera._last_instances:
+                last_state, last_aabb = camera._last_instances[instance]
+                if not _ResourceInstance._same_state(state, last_state):
+                    aabbs += [aabb, last_aabb]
+            else:
+                aabbs.append(aabb)
+        for instance in camera._last_instances:
+            if instance not in instances:
+                aabbs.append(camera._last_instances[instance][1])
+
+        # Everything is dirty if camera has moved.
+        dirty_ranges = None
+        if transformation == camera._last_transformation:
+            dirty_ranges = raster.merge_fragment_ranges(
+                tuple(
+                    raster.aabb_fragment_range(aabb, camera._fragment_axes)
+                    for aabb
+                    in aabbs
+                    if aabb is not None
+                )
+            )
+
+        # Remember state for next frame.
+        camera._last_instances = instances
+        camera._last_transformation = transformation
+
+        return dirty_ranges
+
+    def _rasterize(self, camera, in_data, fragment_range, frame_chars, stats):
+        # Unpack fragment range.
+        (
+            x_s,
+            x_e,
+            y_s,
+            y_e
+        ) = fragment_range
+
+        # Select fragments within range.
+        width = camera._resolution[X]
+        fragment_axes = (
+            camera._fragment_axes[X][x_s:x_e],
+            camera._fragment_axes[Y][y_s:y_e],
+        )
+        out_data = in_data
+        if len(camera._fragments) != (x_e - x_s) * (y_e - y_s):
+            out_data = in_data[:4] + (
+                tuple(
+                    fragment_packet
+                    for y
+                    in range(y_s, y_e)
+                    for fragment_packet
+                    in in_data[4][y * width + x_s:y * width + x_e]
+                ),
+            )
+
+        # Bin polygons and sprites into fragment tiles.
+        if self._rasterizer == RASTER_FRAGMENT:
+            out_data = stage.bin_fragments(
+                out_data,
+                fragment_axes,
+                self._tile_size
+            )
+
+        # Pass data through pipeline to generate pixel fragments.
+        in_fragment_data = out_data[4]
+        out_data = stage.stage_three(
+            out_data,
+            self._rasterizer,
+            fragment_axes,
+            self._chunk_size,
+            self._num_workers
+        )
+        if stats is not None:
+            stats.lap('stage_three')
+            stats.count('fragments', len(in_fragment_data))
+            # Pickling again to measure it is costly, so it is opt-in.
+            if (
+                stats.get_count_pickled_bytes()
+                and self._workers is not None
+                and self._rasterizer == RASTER_FRAGMENT
+            ):
+                stats.count('pickled_bytes', _pickled_size(in_fragment_data))
+                stats.skip()
+
+        # Write pixel fragments into frame.
+        out_fragment_data = out_data[4]
+        for y in range(y_s, y_e):
+            offset = (y - y_s) * (x_e - x_s)
+            frame_chars[y * width + x_s:y * width + x_e] = [
+                fragment_packet[0]
+                for fragment_packet
+                in out_fragment_data[offset:offset + x_e - x_s]
+            ]
+
+    def _record_stage(self, stats, stage_name, in_data, out_data):
+        stats.lap(stage_name)
+
+        # Count packets, and optionally bytes pickled to workers, per stage.
+        pickling = (
+            stats.get_count_pickled_bytes()
+            and self._workers is not None
+        )
+        if stage_name == 'stage_one':
+            stats.count('vertices', len(out_data[1]))
+            if pickling:
+                stats.count(
+                    'pickled_bytes',
+                    _pickled_size(in_data[1]) + _pickled_size(in_data[3])
+                )
+        elif stage_name == 'sync_one':
+            stats.count('sprites', len(out_data[3]))
+        elif stage_name == 'stage_two':
+            stats.count('polygons', len(in_data[2]))
+            stats.count('culled_polygons', out_data[2].count(()))
+            if pickling:
+                stats.count('pickled_bytes', _pickled_size(in_data[2]))
+        elif stage_name == 'sync_two':
+            stats.count('rasterized_polygons', len(out_data[2]))
+
+        # Exclude pickling from next stage.
+        if pickling:
+            stats.skip()
+
+    def _seed_pipeline(self, camera, overlay, plan, textures):
         # Create seed data.
-        out_vertex_data, out_polygon_data = self._seed_model_instances(camera)
+        out_vertex_data, out_polygon_data = self._seed_model_instances(
+            camera,
+            plan,
+            textures
+        )
         out_sprite_data = self._seed_sprite_instances(camera)
         out_fragment_data = self._seed_camera_instance(camera, overlay)
 
@@ -195,59 +804,269 @@ class Engine:
             out_fragment_data,
         )
 
-    def _seed_model_instances(self, camera):
+    def _plan_model_instances(self, camera):
+        # Only instances within the frustum's indexed cells may be visible.
+        instances = self._model_instances
+        if self._instance_index is not None:
+            instances = self._instance_index.query(
+                matrix.compose(camera._projection, camera._transformation),
+                camera._view_frustum
+            )
+
+        # Pair each visible model instance with its cached pipeline output.
+        plan = []
+        for instance in instances:
+            if not instance._hidden:
+                # Select level of detail by projected size.
+                models, lod_size = self._model_lods[instance._resource_name]
+                corners = self._model_corners[instance._resource_name]
+                clip_corners = None
+                level = 0
+                if len(models) > 1 and corners is not None:
+                    clip_corners = camera._gen_clip_corners(
+                        instance._transformation,
+                        corners
+                    )
+                    level = camera._select_lod(
+                        clip_corners,
+                        lod_size,
+                        len(models)
+                    )
+                model = models[level]
+                colormap = self._colormaps[instance._colormap_name]
+                clip_vertices, polygon_data = None, None
+                if self._instance_cache:
+                    clip_vertices, polygon_data = instance._get_cache(
+                        camera,
+                        model,
+                        colormap
+                    )
+                # Instances outside frustum produce neither vertices nor
+                # polygons.
+                if polygon_data is None and corners is not None:
+                    if clip_corners is None:
+                        clip_corners = camera._gen_clip_corners(
+                            instance._transformation,
+                            corners
+                        )
+                    if camera._is_outside(clip_corners):
+                        clip_vertices, polygon_data = (), ()
+                plan.append(
+                    (
+                        instance,
+                        instance._transformation,
+                        model,
+                        level,
+                        colormap,
+                        clip_vertices,
+                        polygon_data,
+                    )
+                )
+
+        return tuple(plan)
+
+    def _seed_model_instances(self, camera, plan, textures):
         # Initialize output data.
         out_vertex_data = []
         out_polygon_data = []
 
+        # Transformed vertices come first, followed by cached vertices.
+        num_vertices = sum(
+            resource.model_size(model)[0]
+            for (
+                instance,
+                transformation,
+                model,
+                level,
+                colormap,
+                clip_vertices,
+                polygon_data
+            )
+            in plan
+            if clip_vertices is None
+        )
+        vert_offset = 0
+        cached_vert_offset = num_vertices
+
+        # Size vertex ranges for workers.
+        if self._workers is not None:
+            range_size = stage.chunk_items(
+                num_vertices,
+                self._chunk_size,
+                self._num_workers
+            )
+
         # Create model instances.
-        for instance in self._model_instances:
-            if not instance._hidden:
+        for (
+            instance,
+            transformation,
+            model,
+            level,
+            colormap,
+            clip_vertices,
+            polygon_data
+        ) in plan:
+            # Skip instances whose polygons are cached.
+            if polygon_data is not None:
+                continue
+
+            # Unpack model data.
+            (
+                vertices,
+                polygons,
+                colors
+            ) = model
+            compact = resource.is_compact_model(model)
+            num_vertices, num_polygons = resource.model_size(model)
+
+            # Pack vertex data.
+            if clip_vertices is not None:
+                offset = cached_vert_offset
+                cached_vert_offset += num_vertices
+            else:
+                offset = vert_offset
+                vert_offset += num_vertices
                 # Transformation from model to clip space.
-                full_transformation = matrix.compose(
-                    camera._projection,
-                    matrix.compose(
+                full_transformation = matrix.compose_many(
+                    (
+                        camera._projection,
                         camera._transformation,
-                        instance._transformation
-                        )
+                        transformation,
+                    )
                 )
-                colormap = self._colormaps[instance._colormap_name]
+                if self._workers is not None:
+                    # Workers hold model vertices, so only pack ranges.
+                    out_vertex_data += [
+                        (
+                            self._model_refs[instance._resource_name][level],
+                            full_transformation,
+                            start,
+                            min(start + range_size, num_vertices),
+                        )
+                        for start
+                        in range(0, num_vertices, range_size)
+                    ]
+                else:
+                    # Transform whole vertex buffer in one packet.
+                    out_vertex_data.append((vertices, full_transformation,))
 
-                # Unpack model data.
+            # Colormap polygons once per frame and level of detail, sharing
+            # them among cameras.
+            if (instance, level,) not in textures:
+                # Colormap material table, then index it per polygon.
                 (
-                    vertices,
-                    polygons,
-                    colors
-                ) = self._models[instance._resource_name]
-                vert_offset = len(out_vertex_data)
-
-                # Pack vertex data.
-                out_vertex_data += [
+                    material_ids,
+                    materials
+                ) = self._model_materials[instance._resource_name][level]
+                material_textures = tuple(
+                    colormap[material]
+                    for material
+                    in materials
+                )
+                textures[instance, level] = tuple(
+                    map(material_textures.__getitem__, material_ids)
+                )
+            polygon_textures = textures[instance, level]
+
+            # Pack polygon data.
+            if compact:
+                out_polygon_data += [
                     (
-                        vertex,
-                        full_transformation,
+                        (
+                            polygons[polygon * 3] + offset,
+                            polygons[polygon * 3 + 1] + offset,
+                            polygons[polygon * 3 + 2] + offset,
+                        ),
+                        polygon_textures[polygon],
+                        camera._view_frustum,
                     )
-                    for vertex
-                    in vertices
+                    for polygon
+                    in range(num_polygons)
                 ]
-
-                # Pack polygon data.
+            else:
                 out_polygon_data += [
                     (
                         (
-                            polygons[polygon][0] + vert_offset,
-                            polygons[polygon][1] + vert_offset,
-                            polygons[polygon][2] + vert_offset,
+                            polygons[polygon][0] + offset,
+                            polygons[polygon][1] + offset,
+                            polygons[polygon][2] + offset,
                         ),
-                        colormap[colors[polygon]],
+                        polygon_textures[polygon],
                         camera._view_frustum,
                     )
                     for polygon
-                    in range(len(polygons))
+                    in range(num_polygons)
                 ]
 
         return tuple(out_vertex_data), tuple(out_polygon_data)
 
+    def _reuse_model_instances(self, plan, in_data):
+        # Append cached vertices of instances whose polygons are not cached.
+        return (
+            in_data[0],
+            in_data[1] + tuple(
+                vertex_packet
+                for (
+                    instance,
+                    transformation,
+                    model,
+                    level,
+                    colormap,
+                    clip_vertices,
+                    polygon_data
+                )
+                in plan
+                if clip_vertices is not None and polygon_data is None
+                for vertex_packet
+                in clip_vertices
+            ),
+        ) + in_data[2:]
+
+    def _merge_model_instances(self, camera, generation, plan, in_data):
+        # Initialize output data.
+        out_polygon_data = []
+
+        # Merge cached and processed polygons in instance order.
+        vert_offset = 0
+        poly_offset = 0
+        for (
+            instance,
+            transformation,
+            model,
+            level,
+            colormap,
+            clip_vertices,
+            polygon_data
+        ) in plan:
+            if polygon_data is None:
+                num_vertices, num_polygons = resource.model_size(model)
+                if clip_vertices is None:
+                    clip_vertices = in_data[1][
+                        vert_offset:vert_offset + num_vertices
+                    ]
+                    vert_offset += num_vertices
+                polygon_data = tuple(
+                    in_data[2][poly_offset:poly_offset + num_polygons]
+                )
+                poly_offset += num_polygons
+                if self._instance_cache:
+                    instance._set_cache(
+                        camera,
+                        generation,
+                        transformation,
+                        model,
+                        colormap,
+                        clip_vertices,
+                        polygon_data
+                    )
+            out_polygon_data += polygon_data
+
+        return (
+            in_data[:2]
+            + (tuple(out_polygon_data),)
+            + in_data[3:]
+        )
+
     def _seed_sprite_instances(self, camera):
         # Initialize output data.
         out_sprite_data = []
@@ -264,19 +1083,21 @@ class Engine:
 
                 # Unpack sprite data.
                 (
-                    sprite
+                    palette,
+                    rows
                 ) = self._sprites[instance._resource_name]
 
-                # Colormap sprite.
+                # Colormap sprite by translating its palette indices.
                 if instance._mapped_sprite is None:
+                    mapped_palette = tuple(
+                        colormap[color]
+                        for color
+                        in palette
+                    )
                     instance._mapped_sprite = tuple(
-                        tuple(
-                            colormap[pixel]
-                            for pixel
-                            in row
-                        )
+                        row.translate(mapped_palette)
                         for row
-                        in sprite
+                        in rows
                     )
                 mapped_sprite = instance._mapped_sprite
 
@@ -310,8 +1131,29 @@ class Engine:
         return out_fragment_data
 
 
+def _pickled_size(data):
+    return len(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+
+
+def _release_segments(segments):
+    for level_segments in segments.values():
+        for segment in level_segments:
+            shared.release(segment)
+    segments.clear()
+
+
 class Camera:
-    def __init__(self, resolution, near, far, fov, ratio, fog_char, culling):
+    def __init__(
+        self,
+        resolution,
+        near,
+        far,
+        fov,
+        ratio,
+        fog_char,
+        culling,
+        incremental
+    ):
         # Initialize instance attributes.
         self._resolution = resolution
         self._near = near
@@ -324,7 +1166,25 @@ class Camera:
             self._gen_fragments(resolution),
             ()
         )
+        self._fragment_axes = (
+            tuple(
+                fragment[X]
+                for fragment
+                in self._fragments[:resolution[X]]
+            ),
+            tuple(
+                fragment[Y]
+                for fragment
+                in self._fragments[::resolution[X]]
+            ),
+        )
         self._transformation = matrix.IDENTITY_H
+        self._generation = 0
+        self._incremental = incremental
+        self._last_frame = None
+        self._last_instances = {}
+        self._last_transformation = None
+        self._front_frame = None
         self._view_plane_ub = self._gen_view_plane_ub(near, fov, ratio)
         self._view_frustum = [
             # Near plane.
@@ -369,10 +1229,55 @@ class Camera:
 
     def set_transformation(self, transformation):
         self._transformation = transformation
+        self._generation += 1
+
+    def get_front_frame(self):
+        return self._front_frame
 
     def get_view_upper_bound(self):
         return self._view_plane_ub
 
+    def _gen_clip_corners(self, transformation, corners):
+        # Transform bounding box corners from model to clip space.
+        full_transformation = matrix.compose_many(
+            (
+                self._projection,
+                self._transformation,
+                transformation,
+            )
+        )
+
+        return matrix.transform_many_h(full_transformation, corners)
+
+    def _is_outside(self, clip_corners):
+        return (
+            polygon.classify_box_h(clip_corners, self._view_frustum)
+            == BOX_OUTSIDE
+        )
+
+    def _select_lod(self, clip_corners, lod_size, num_levels):
+        # Boxes reaching behind near plane are too close to simplify.
+        if any(corner[W] < self._near for corner in clip_corners):
+            return 0
+
+        # Measure projected box in fragments along its longer screen axis.
+        size = max(
+            (
+                max(corner[axis] / corner[W] for corner in clip_corners)
+                - min(corner[axis] / corner[W] for corner in clip_corners)
+            ) * self._resolution[axis] / 2
+            for axis
+            in (X, Y,)
+        )
+
+        # Use next coarser level each time size halves below LOD size.
+        if size >= lod_size:
+            return 0
+        if size <= 0.0:
+            return num_levels - 1
+
+        return min(int(math.log2(lod_size / size)) + 1, num_levels - 1)
+
     def _gen_view_plane_ub(self, near, fov, ratio):
         y_pos = near * math.tan(fov / 2)
 
@@ -423,6 +1328,24 @@ class _ResourceInstance:
     def unhide(self):
         self._hidden = False
 
+    def _gen_state(self, resources, colormaps):
+        return (
+            self._hidden,
+            self._transformation,
+            resources.get(self._resource_name),
+            colormaps.get(self._colormap_name),
+        )
+
+    @staticmethod
+    def _same_state(state_a, state_b):
+        # Compare resources by identity, since reloading replaces them.
+        return (
+            state_a[0] == state_b[0]
+            and state_a[1] == state_b[1]
+            and state_a[2] is state_b[2]
+            and state_a[3] is state_b[3]
+        )
+
 
 class SpriteInstance(_ResourceInstance):
     def __init__(self, sprite_name, colormap_name):
@@ -439,3 +1362,50 @@ class ModelInstance(_ResourceInstance):
     def __init__(self, model_name, colormap_name):
         # Initialize instance attributes.
         super().__init__(model_name, colormap_name)
+        self._cache = weakref.WeakKeyDictionary()
+        self._reindex = None
+
+    def set_transformation(self, transformation):
+        super().set_transformation(transformation)
+        self._cache.clear()
+        if self._reindex is not None:
+            self._reindex(self)
+
+    def _get_cache(self, camera, model, colormap):
+        # Validate cache against camera generation, transformation and
+        # reloaded resources.
+        clip_vertices = None
+        polygon_data = None
+        cache = self._cache.get(camera)
+        if (
+            cache is not None
+            and cache[0] == camera._generation
+            and cache[1] is self._transformation
+        ):
+            if cache[2] is model:
+                clip_vertices = cache[3]
+                if cache[4] is colormap:
+                    polygon_data = cache[5]
+
+        return clip_vertices, polygon_data
+
+    def _set_cache(
+        self,
+        camera,
+        generation,
+        transformation,
+        model,
+        colormap,
+        clip_vertices,
+        polygon_data
+    ):
+        # Key cache by state seeded from, which a frame finishing in the
+        # background may no longer share with this instance.
+        self._cache[camera] = (
+            generation,
+            transformation,
+            model,
+            clip_vertices,
+            colormap,
+            polygon_data,
+        )
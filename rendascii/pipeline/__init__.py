@@ -2,3 +2,9 @@
 This file is part of RendASCII which is released under MIT.
 See file LICENSE.txt for full license details.
 """
+
+
+# Module constants.
+RASTER_FRAGMENT = 'fragment'
+RASTER_NUMPY = 'numpy'
+RASTER_SCANLINE = 'scanline'
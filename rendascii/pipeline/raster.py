@@ -0,0 +1,334 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+from bisect import bisect_left, bisect_right
+from rendascii.geometry import kernel
+from rendascii.geometry import X, Y
+
+# NumPy is optional; the rasterizers depending on it are disabled without it.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def numpy_available():
+    return numpy is not None
+
+
+def aabb_fragment_range(aabb, fragment_axes):
+    # Reject empty (or undefined) AABBs.
+    if not (aabb[0][X] < aabb[1][X] and aabb[0][Y] < aabb[1][Y]):
+        return None
+
+    # Find fragments strictly within AABB along each axis.
+    x_s = bisect_right(fragment_axes[X], aabb[0][X])
+    x_e = bisect_left(fragment_axes[X], aabb[1][X])
+    y_s = bisect_right(fragment_axes[Y], aabb[0][Y])
+    y_e = bisect_left(fragment_axes[Y], aabb[1][Y])
+    if x_s >= x_e or y_s >= y_e:
+        return None
+
+    return (x_s, x_e, y_s, y_e,)
+
+
+def merge_fragment_ranges(fragment_ranges):
+    # Merge overlapping fragment ranges until none overlap.
+    merged = []
+    for fragment_range in fragment_ranges:
+        if fragment_range is None:
+            continue
+        x_s, x_e, y_s, y_e = fragment_range
+        overlap = True
+        while overlap:
+            overlap = False
+            for other in merged:
+                if (
+                    x_s < other[1] and other[0] < x_e
+                    and y_s < other[3] and other[2] < y_e
+                ):
+                    merged.remove(other)
+                    x_s = min(x_s, other[0])
+                    x_e = max(x_e, other[1])
+                    y_s = min(y_s, other[2])
+                    y_e = max(y_e, other[3])
+                    overlap = True
+                    break
+        merged.append((x_s, x_e, y_s, y_e,))
+
+    return tuple(merged)
+
+
+def scanline_rasterize(fragment_data, polygons, sprites, fragment_axes):
+    # Unpack fragment grid.
+    axis_x = fragment_axes[X]
+    axis_y = fragment_axes[Y]
+    width = len(axis_x)
+
+    # Initialize character and depth buffers.
+    char_buffer = [fragment_packet[0] for fragment_packet in fragment_data]
+    depth_buffer = [-1.0] * len(fragment_data)
+
+    # Rasterize polygons.
+    for polygon_packet in polygons:
+        # Unpack polygon packet.
+        (
+            poly_verts,
+            texture,
+            depths,
+            aabb
+        ) = polygon_packet
+        # Transparent polygons never update the buffers.
+        if texture == '\0':
+            continue
+        # Clamp traversal to fragments the polygon AABB contains.
+        fragment_range = aabb_fragment_range(aabb, fragment_axes)
+        if fragment_range is None:
+            continue
+        x_s, x_e, y_s, y_e = fragment_range
+        # Split each edge function into a column term and a row term, in
+        # the same operation order as polygon.poly_contains_point_2d.
+        v0, v1, v2 = poly_verts
+        edges = ((v2, v0,), (v0, v1,), (v1, v2,),)
+        col_terms = tuple(
+            tuple(
+                (axis_x[x] - line_e[X]) * (line_s[Y] - line_e[Y])
+                for x
+                in range(x_s, x_e)
+            )
+            for line_s, line_e
+            in edges
+        )
+        col_terms_0, col_terms_1, col_terms_2 = col_terms
+        # Walk AABB rows.
+        for y in range(y_s, y_e):
+            point_y = axis_y[y]
+            row_term_0, row_term_1, row_term_2 = (
+                (line_s[X] - line_e[X]) * (point_y - line_e[Y])
+                for line_s, line_e
+                in edges
+            )
+            offset = y * width + x_s
+            # Walk AABB columns, stepping edge functions.
+            for x in range(x_e - x_s):
+                start = col_terms_0[x] - row_term_0 <= 0
+                if (
+                    ((col_terms_1[x] - row_term_1 <= 0) == start)
+                    and ((col_terms_2[x] - row_term_2 <= 0) == start)
+                ):
+                    # Interpolate fragment z depth.
+                    depth = kernel.tri_interpolate_2d(
+                        poly_verts,
+                        depths,
+                        (axis_x[x_s + x], point_y,)
+                    )
+                    # Determine whether to update buffers.
+                    current_depth = depth_buffer[offset + x]
+                    if current_depth < 0.0 or depth < current_depth:
+                        char_buffer[offset + x] = texture
+                        depth_buffer[offset + x] = depth
+
+    # Rasterize sprites.
+    for sprite_packet in sprites:
+        # Unpack sprite data.
+        (
+            sprite,
+            depth,
+            aabb,
+            size
+        ) = sprite_packet
+        # Clamp traversal to fragments the sprite AABB contains.
+        fragment_range = aabb_fragment_range(aabb, fragment_axes)
+        if fragment_range is None:
+            continue
+        x_s, x_e, y_s, y_e = fragment_range
+        # Precompute texel columns.
+        texel_xs = tuple(
+            int((axis_x[x] - aabb[0][X]) / size[X] * len(sprite[0]))
+            for x
+            in range(x_s, x_e)
+        )
+        # Walk AABB rows.
+        for y in range(y_s, y_e):
+            row = sprite[int((axis_y[y] - aabb[0][Y]) / size[Y] * len(sprite))]
+            offset = y * width + x_s
+            # Walk AABB columns.
+            for x in range(x_e - x_s):
+                # Interpolate fragment texture.
+                texture = row[texel_xs[x]]
+                # Determine whether to update buffers.
+                current_depth = depth_buffer[offset + x]
+                if current_depth < 0.0 or depth < current_depth:
+                    if texture != '\0':
+                        char_buffer[offset + x] = texture
+                        depth_buffer[offset + x] = depth
+
+    # Overlay fragments.
+    return tuple(
+        (
+            fragment_data[fragment][1]
+            if fragment_data[fragment][1] != '\0'
+            else char_buffer[fragment],
+        )
+        for fragment
+        in range(len(fragment_data))
+    )
+
+
+def np_rasterize(fragment_data, polygons, sprites, fragment_axes):
+    # Unpack fragment grid.
+    axis_x = numpy.array(fragment_axes[X], dtype=numpy.float64)
+    axis_y = numpy.array(fragment_axes[Y], dtype=numpy.float64)
+    shape = (len(axis_y), len(axis_x),)
+
+    # Initialize character and depth buffers.
+    char_buffer = numpy.array(
+        tuple(
+            ord(fragment_packet[0])
+            for fragment_packet
+            in fragment_data
+        ),
+        dtype=numpy.int64
+    ).reshape(shape)
+    overlay_buffer = numpy.array(
+        tuple(
+            ord(fragment_packet[1])
+            for fragment_packet
+            in fragment_data
+        ),
+        dtype=numpy.int64
+    ).reshape(shape)
+    depth_buffer = numpy.full(shape, -1.0)
+
+    # Ignore floating point warnings from degenerate polygons.
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+
+        # Rasterize polygons.
+        for polygon_packet in polygons:
+            # Unpack polygon packet.
+            (
+                poly_verts,
+                texture,
+                depths,
+                aabb
+            ) = polygon_packet
+            # Transparent polygons never update the buffers.
+            if texture == '\0':
+                continue
+            # Determine which fragments the polygon AABB contains.
+            window = _np_aabb_window(aabb, axis_x, axis_y)
+            if window is None:
+                continue
+            rows, cols, point_x, point_y = window
+            # Determine which fragments the polygon contains.
+            v0, v1, v2 = poly_verts
+            start = _np_edge_2d(point_x, point_y, v2, v0) <= 0
+            inside = (
+                ((_np_edge_2d(point_x, point_y, v0, v1) <= 0) == start)
+                & ((_np_edge_2d(point_x, point_y, v1, v2) <= 0) == start)
+            )
+            # Interpolate fragment z depths.
+            area_t = _np_double_area_2d(v0[X], v0[Y], v1, v2)
+            depth = (
+                _np_double_area_2d(point_x, point_y, v1, v2) / area_t
+                * depths[0]
+                + _np_double_area_2d(point_x, point_y, v2, v0) / area_t
+                * depths[1]
+                + _np_double_area_2d(point_x, point_y, v0, v1) / area_t
+                * depths[2]
+            )
+            # Update buffers where the polygon is nearest.
+            current_depth = depth_buffer[rows, cols]
+            update = inside & (
+                (current_depth < 0.0) | (depth < current_depth)
+            )
+            char_buffer[rows, cols][update] = ord(texture)
+            current_depth[update] = depth[update]
+
+        # Rasterize sprites.
+        for sprite_packet in sprites:
+            # Unpack sprite data.
+            (
+                sprite,
+                depth,
+                aabb,
+                size
+            ) = sprite_packet
+            # Determine which fragments the sprite AABB contains.
+            window = _np_aabb_window(aabb, axis_x, axis_y)
+            if window is None:
+                continue
+            rows, cols, point_x, point_y = window
+            # Interpolate fragment textures.
+            texels = numpy.array(
+                tuple(
+                    tuple(
+                        ord(texture)
+                        for texture
+                        in row
+                    )
+                    for row
+                    in sprite
+                ),
+                dtype=numpy.int64
+            )
+            texel_x = (
+                (point_x[0] - aabb[0][X]) / size[X] * len(sprite[0])
+            ).astype(numpy.int64)
+            texel_y = (
+                (point_y[:, 0] - aabb[0][Y]) / size[Y] * len(sprite)
+            ).astype(numpy.int64)
+            texture = texels[numpy.ix_(texel_y, texel_x)]
+            # Update buffers where the sprite is nearest.
+            current_depth = depth_buffer[rows, cols]
+            update = (texture != 0) & (
+                (current_depth < 0.0) | (depth < current_depth)
+            )
+            char_buffer[rows, cols][update] = texture[update]
+            current_depth[update] = depth
+
+    # Overlay fragments.
+    char_buffer = numpy.where(overlay_buffer != 0, overlay_buffer, char_buffer)
+
+    return tuple(
+        (chr(texture),)
+        for texture
+        in char_buffer.ravel().tolist()
+    )
+
+
+# Helper functions.
+
+def _np_aabb_window(aabb, axis_x, axis_y):
+    # Find fragments strictly within AABB along each axis.
+    fragment_range = aabb_fragment_range(aabb, (axis_x, axis_y,))
+    if fragment_range is None:
+        return None
+    x_s, x_e, y_s, y_e = fragment_range
+
+    return (
+        slice(y_s, y_e),
+        slice(x_s, x_e),
+        axis_x[numpy.newaxis, x_s:x_e],
+        axis_y[y_s:y_e, numpy.newaxis],
+    )
+
+
+def _np_edge_2d(point_x, point_y, line_s, line_e):
+    # Same operation order as polygon._edge_2d, broadcast over a window.
+    return (
+        (point_x - line_e[X]) * (line_s[Y] - line_e[Y])
+        - (line_s[X] - line_e[X]) * (point_y - line_e[Y])
+    )
+
+
+def _np_double_area_2d(point_x, point_y, v1, v2):
+    # Same operation order as polygon._double_area_2d, broadcast over a window.
+    area = (
+        point_x * v1[Y] + v1[X] * v2[Y] + v2[X] * point_y
+        - point_x * v2[Y] - v2[X] * v1[Y] - v1[X] * point_y
+    )
+    return numpy.abs(area)
@@ -4,9 +4,10 @@ See file LICENSE.txt for full license details.
 """
 
 
-from rendascii.geometry import matrix, polygon, vector
+from rendascii.geometry import kernel, matrix, polygon, vector
 from rendascii.geometry import PLANE_POINT
-from rendascii.geometry import X, Y, Z, W
+from rendascii.geometry import X, Y, Z
+from rendascii.pipeline import shared
 
 
 def s1_vertex_shader(in_packet):
@@ -35,6 +36,60 @@ def s1_vertex_shader(in_packet):
     return out_packet
 
 
+def s1_vertex_range_shader(in_packet):
+    # Declare output packet.
+    out_packet = None
+
+    # Unpack input packet.
+    (
+        model_ref,
+        full_transformation,
+        start,
+        end
+    ) = in_packet
+
+    # Transform resident model vertices within range at once.
+    vertices = shared.fetch_resident(model_ref)
+    # Compact models store vertices in flat arrays of triplets.
+    flat = type(vertices) is not tuple
+    if flat:
+        vertices = vertices[start * 3:end * 3]
+    else:
+        vertices = vertices[start:end]
+    out_packet = tuple(
+        (vert_clip,)
+        for vert_clip
+        in matrix.transform_points_h(full_transformation, vertices, flat)
+    )
+
+    return out_packet
+
+
+def s1_vertex_buffer_shader(in_packet):
+    # Declare output packet.
+    out_packet = None
+
+    # Unpack input packet.
+    (
+        vertices,
+        full_transformation
+    ) = in_packet
+
+    # Transform model vertices from model to clip space at once. Compact
+    # models store vertices in flat arrays of triplets.
+    out_packet = tuple(
+        (vert_clip,)
+        for vert_clip
+        in matrix.transform_points_h(
+            full_transformation,
+            vertices,
+            type(vertices) is not tuple
+        )
+    )
+
+    return out_packet
+
+
 def s2_polygon_shader(in_packet):
     # Declare output packet.
     out_packet = ()
@@ -46,13 +101,12 @@ def s2_polygon_shader(in_packet):
         view_frustum,
     ) = in_packet
 
-    # Perform back-face culling.
-    poly_trunc = tuple(vertex[:W] for vertex in poly_clip)
-    direction = vector.dot(
-        polygon.normal_3d(
-            poly_trunc
+    # Perform back-face culling, on X, Y and Z only.
+    direction = kernel.dot_3d(
+        kernel.normal_3d(
+            poly_clip
         ),
-        poly_trunc[0],
+        poly_clip[0],
     )
     if direction <= 0.0:
         # Declare output data.
@@ -75,8 +129,7 @@ def s2_polygon_shader(in_packet):
             tmp_depths = [None] * 3
             for v in range(3):
                 v_3d = vector.conv_h_to_3d(culled_polys[p][v])
-                v_2d = vector.conv_3d_to_2d(v_3d)
-                tmp_poly[v] = v_2d
+                tmp_poly[v] = (v_3d[X], v_3d[Y],)
                 tmp_depths[v] = v_3d[Z]
             out_polys.append(tmp_poly)
             depths.append(tmp_depths)
@@ -87,7 +140,7 @@ def s2_polygon_shader(in_packet):
                 out_polys[p],
                 texture,
                 depths[p],
-                polygon.generate_aabb_2d(out_polys[p]),
+                kernel.tri_aabb_2d(out_polys[p]),
             )
             for p
             in range(len(out_polys))
@@ -141,11 +194,11 @@ def s1_sprite_shader(in_packet):
         # Reorient and transform bound from camera to clip space.
         bound_clip = matrix.transform_h(
             projection,
-            vector.add(
+            kernel.add_h(
                 origin_camera_h,
                 (
                     0.0,
-                    vector.distance(origin_camera_h, bound_camera_h),
+                    kernel.distance_h(origin_camera_h, bound_camera_h),
                     0.0,
                     0.0,
                 )
@@ -159,7 +212,7 @@ def s1_sprite_shader(in_packet):
         bound_ndc = vector.conv_h_to_3d(bound_clip)
 
         # Create sprite AABB.
-        half_height = vector.distance(bound_ndc, origin_ndc)
+        half_height = kernel.distance_3d(bound_ndc, origin_ndc)
         half_width = half_height * len(sprite[0]) / len(sprite) / aspect_ratio
         radius = (half_width, half_height,)
 
@@ -168,10 +221,10 @@ def s1_sprite_shader(in_packet):
             sprite,
             origin_ndc[Z],
             (
-                vector.subtract(origin_ndc[:Z], radius),
-                vector.add(origin_ndc[:Z], radius),
+                kernel.subtract_2d(origin_ndc, radius),
+                kernel.add_2d(origin_ndc, radius),
             ),
-            vector.multiply(radius, 2.0),
+            kernel.multiply_2d(radius, 2.0),
         )
 
     return out_packet
@@ -212,12 +265,12 @@ def s3_fragment_shader(in_packet):
                 aabb,
                 fragment
             ):
-                if polygon.poly_contains_point_2d(
+                if kernel.tri_contains_point_2d(
                     poly_verts,
                     fragment
                 ):
                     # Interpolate fragment z depth.
-                    depth = polygon.interpolate_attribute_2d(
+                    depth = kernel.tri_interpolate_2d(
                         poly_verts,
                         depths,
                         fragment
@@ -243,7 +296,7 @@ def s3_fragment_shader(in_packet):
                 fragment
             ):
                 # Interpolate fragment texture.
-                point = vector.subtract(fragment, aabb[0])
+                point = kernel.subtract_2d(fragment, aabb[0])
                 x = int(point[X] / size[X] * len(sprite[0]))
                 y = int(point[Y] / size[Y] * len(sprite))
                 texture = sprite[y][x]
@@ -259,3 +312,25 @@ def s3_fragment_shader(in_packet):
     )
 
     return out_packet
+
+
+def s3_fragment_range_shader(in_packet):
+    # Declare output packet.
+    out_packet = None
+
+    # Unpack input packet.
+    (
+        handle,
+        start,
+        end
+    ) = in_packet
+
+    # Shade shared fragment data within range.
+    fragment_data = shared.fetch(handle)
+    out_packet = tuple(
+        s3_fragment_shader(fragment_data[fragment])
+        for fragment
+        in range(start, end)
+    )
+
+    return out_packet
@@ -0,0 +1,100 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+from multiprocessing import resource_tracker, shared_memory
+import os
+import pickle
+
+
+# Most recently fetched data, keyed by segment name (per process).
+_fetched = {}
+# Resident data, keyed by resource name (per process).
+_resident = {}
+# Barrier shared by all workers of a pool (per process).
+_barrier = None
+
+
+def initialize():
+    # Start resource tracker before forking workers so that they share it.
+    if os.name == 'posix':
+        resource_tracker.ensure_running()
+
+
+def initialize_worker(barrier):
+    global _barrier
+    _barrier = barrier
+
+
+def publish(data):
+    # Serialize data into a new shared memory segment.
+    raw_data = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+    segment = shared_memory.SharedMemory(create=True, size=len(raw_data))
+    segment.buf[:len(raw_data)] = raw_data
+
+    # Workers locate data by segment name and size.
+    handle = (
+        segment.name,
+        len(raw_data),
+    )
+
+    return segment, handle
+
+
+def fetch(handle):
+    # Deserialize data once per process and segment.
+    if handle[0] not in _fetched:
+        _fetched.clear()
+        _fetched[handle[0]] = _load(handle)
+
+    return _fetched[handle[0]]
+
+
+def fetch_resident(resource_ref):
+    # Unpack resource reference.
+    (
+        name,
+        generation,
+        handle
+    ) = resource_ref
+
+    # Deserialize data once per process and resource generation.
+    resident = _resident.get(name)
+    if resident is None or resident[0] != generation:
+        resident = (generation, _load(handle),)
+        _resident[name] = resident
+
+    return resident[1]
+
+
+def evict_resident(names):
+    # Evict resident data, then wait for every worker to do the same, so
+    # that each worker takes exactly one of the broadcast evictions.
+    for name in names:
+        _resident.pop(name, None)
+    _barrier.wait()
+
+
+def release(segment):
+    segment.close()
+    segment.unlink()
+
+
+# Helper functions.
+
+def _load(handle):
+    # Unpack handle.
+    (
+        name,
+        size
+    ) = handle
+
+    # Deserialize data from shared memory segment.
+    segment = shared_memory.SharedMemory(name=name)
+    with segment.buf[:size] as raw_data:
+        data = pickle.loads(raw_data)
+    segment.close()
+
+    return data
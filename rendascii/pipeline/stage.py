@@ -4,10 +4,17 @@ See file LICENSE.txt for full license details.
 """
 
 
-from rendascii.pipeline import shader
+from itertools import chain
+from rendascii.geometry import X, Y
+from rendascii.pipeline import raster, shader, shared
+from rendascii.pipeline import RASTER_FRAGMENT, RASTER_NUMPY, RASTER_SCANLINE
 
 
-def stage_one(in_data):
+# Module constants.
+CHUNKS_PER_WORKER = 4
+
+
+def stage_one(in_data, chunk_size=None, num_workers=1):
     # Unpack input data.
     (
         workers,
@@ -25,10 +32,11 @@ def stage_one(in_data):
 
     # Process data.
     if workers is None:
+        # Vertex data holds whole model vertex buffers.
         out_vertex_data = tuple(
-            shader.s1_vertex_shader(vertex_packet)
-            for vertex_packet
-            in in_vertex_data
+            chain.from_iterable(
+                map(shader.s1_vertex_buffer_shader, in_vertex_data)
+            )
         )
         out_sprite_data = tuple(
             shader.s1_sprite_shader(sprite_packet)
@@ -36,13 +44,20 @@ def stage_one(in_data):
             in in_sprite_data
         )
     else:
-        out_vertex_data = workers.map(
-            shader.s1_vertex_shader,
-            in_vertex_data
+        # Vertex data holds ranges of worker-resident model vertices.
+        out_vertex_data = tuple(
+            chain.from_iterable(
+                workers.map(
+                    shader.s1_vertex_range_shader,
+                    in_vertex_data,
+                    1
+                )
+            )
         )
         out_sprite_data = workers.map(
             shader.s1_sprite_shader,
-            in_sprite_data
+            in_sprite_data,
+            chunk_items(len(in_sprite_data), chunk_size, num_workers)
         )
 
     # Pack output data.
@@ -55,7 +70,7 @@ def stage_one(in_data):
     )
 
 
-def stage_two(in_data):
+def stage_two(in_data, chunk_size=None, num_workers=1):
     # Unpack input data.
     (
         workers,
@@ -81,7 +96,8 @@ def stage_two(in_data):
     else:
         out_polygon_data = workers.map(
             shader.s2_polygon_shader,
-            in_polygon_data
+            in_polygon_data,
+            chunk_items(len(in_polygon_data), chunk_size, num_workers)
         )
 
     # Pack output data.
@@ -94,7 +110,13 @@ def stage_two(in_data):
     )
 
 
-def stage_three(in_data):
+def stage_three(
+    in_data,
+    rasterizer=RASTER_FRAGMENT,
+    fragment_axes=None,
+    chunk_size=None,
+    num_workers=1
+):
     # Unpack input data.
     (
         workers,
@@ -111,17 +133,53 @@ def stage_three(in_data):
     out_fragment_data = None
 
     # Process data.
-    if workers is None:
+    if rasterizer == RASTER_NUMPY:
+        out_fragment_data = raster.np_rasterize(
+            in_fragment_data,
+            in_polygon_data,
+            in_sprite_data,
+            fragment_axes
+        )
+    elif rasterizer == RASTER_SCANLINE:
+        out_fragment_data = raster.scanline_rasterize(
+            in_fragment_data,
+            in_polygon_data,
+            in_sprite_data,
+            fragment_axes
+        )
+    elif workers is None:
         out_fragment_data = tuple(
             shader.s3_fragment_shader(fragment_packet)
             for fragment_packet
             in in_fragment_data
         )
     else:
-        out_fragment_data = workers.map(
-            shader.s3_fragment_shader,
-            in_fragment_data
-        )
+        # Publish fragment data once and distribute whole fragment rows.
+        width = len(fragment_axes[X])
+        rows = chunk_items(len(fragment_axes[Y]), None, num_workers)
+        if chunk_size is not None:
+            rows = -(-chunk_size // width)
+        range_size = rows * width
+        segment, handle = shared.publish(in_fragment_data)
+        try:
+            out_fragment_data = tuple(
+                chain.from_iterable(
+                    workers.map(
+                        shader.s3_fragment_range_shader,
+                        tuple(
+                            (
+                                handle,
+                                start,
+                                min(start + range_size, len(in_fragment_data)),
+                            )
+                            for start
+                            in range(0, len(in_fragment_data), range_size)
+                        )
+                    )
+                )
+            )
+        finally:
+            shared.release(segment)
 
     # Pack output data.
     return (
@@ -133,6 +191,14 @@ def stage_three(in_data):
     )
 
 
+def chunk_items(num_items, chunk_size, num_workers):
+    # Automatically spread items over a few chunks per worker.
+    if chunk_size is None:
+        chunk_size = -(-num_items // (num_workers * CHUNKS_PER_WORKER))
+
+    return max(chunk_size, 1)
+
+
 def sync_one(in_data):
     # Unpack input data.
     (
@@ -218,3 +284,81 @@ def sync_two(in_data):
         out_sprite_data,
         out_fragment_data,
     )
+
+
+def bin_fragments(in_data, fragment_axes, tile_size):
+    # Unpack input data.
+    (
+        workers,
+        in_vertex_data,
+        in_polygon_data,
+        in_sprite_data,
+        in_fragment_data
+    ) = in_data
+
+    # Declare/initialize output data.
+    out_vertex_data = in_vertex_data
+    out_polygon_data = in_polygon_data
+    out_sprite_data = in_sprite_data
+    out_fragment_data = None
+
+    # Initialize tiles.
+    width = len(fragment_axes[X])
+    num_tiles_x = (width + tile_size - 1) // tile_size
+    num_tiles_y = (len(fragment_axes[Y]) + tile_size - 1) // tile_size
+    tile_polygons = [[] for tile in range(num_tiles_x * num_tiles_y)]
+    tile_sprites = [[] for tile in range(num_tiles_x * num_tiles_y)]
+
+    # Sort polygons and sprites into tiles overlapping their AABBs.
+    for packets, tile_packets, aabb_index in (
+        (in_polygon_data, tile_polygons, 3,),
+        (in_sprite_data, tile_sprites, 2,),
+    ):
+        for packet in packets:
+            fragment_range = raster.aabb_fragment_range(
+                packet[aabb_index],
+                fragment_axes
+            )
+            if fragment_range is not None:
+                x_s, x_e, y_s, y_e = fragment_range
+                for tile_y in range(
+                    y_s // tile_size,
+                    (y_e - 1) // tile_size + 1
+                ):
+                    for tile_x in range(
+                        x_s // tile_size,
+                        (x_e - 1) // tile_size + 1
+                    ):
+                        tile_packets[tile_y * num_tiles_x + tile_x].append(
+                            packet
+                        )
+    tile_polygons = tuple(tuple(packets) for packets in tile_polygons)
+    tile_sprites = tuple(tuple(packets) for packets in tile_sprites)
+
+    # Reference only overlapping polygons and sprites from each fragment.
+    out_fragment_data = []
+    for fragment in range(len(in_fragment_data)):
+        fragment_packet = in_fragment_data[fragment]
+        tile = (
+            fragment // width // tile_size * num_tiles_x
+            + fragment % width // tile_size
+        )
+        out_fragment_data.append(
+            (
+                fragment_packet[0],
+                fragment_packet[1],
+                fragment_packet[2],
+                tile_polygons[tile],
+                tile_sprites[tile],
+            )
+        )
+    out_fragment_data = tuple(out_fragment_data)
+
+    # Pack output data.
+    return (
+        workers,
+        out_vertex_data,
+        out_polygon_data,
+        out_sprite_data,
+        out_fragment_data,
+    )
@@ -0,0 +1,341 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+from array import array
+from bisect import bisect_right
+from itertools import groupby
+import mmap
+import os
+from rendascii.terminal import diff_runs
+import struct
+import sys
+import time
+
+
+# Module constants.
+RECORDING_MAGIC = b'RASCIIFR'
+RECORDING_VERSION = 1
+RECORDING_HEADER = struct.Struct('<8sI')
+RECORD_HEADER = struct.Struct('<BQdI')
+INDEX_TRAILER = struct.Struct('<8sQ')
+INDEX_MAGIC = b'RASCIIIX'
+RECORD_KEYFRAME = 0
+RECORD_DELTA = 1
+RECORD_INDEX = 2
+KEYFRAME_INTERVAL = 60
+MAX_RUN_GAP = 4
+_UINT32_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+
+class FrameRecorder:
+    def __init__(
+        self,
+        filename,
+        frame_rate_manager=None,
+        keyframe_interval=KEYFRAME_INTERVAL
+    ):
+        # Initialize instance attributes.
+        self._file = open(filename, 'wb')
+        self._frame_rate_manager = frame_rate_manager
+        self._keyframe_interval = keyframe_interval
+        self._keyframes = []
+        self._num_frames = 0
+        self._last_text = None
+        self._start = time.perf_counter()
+
+        # Write header.
+        self._file.write(
+            RECORDING_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION)
+        )
+
+    def record(self, frame):
+        text = _frame_text(frame)
+
+        # Timestamp frame, preferably by frame-rate manager's clock.
+        timestamp = (
+            time.perf_counter() - self._start
+            if self._frame_rate_manager is None
+            else self._frame_rate_manager.get_total_time()
+        )
+
+        # Encode delta against previous frame, unless a keyframe is due or
+        # the delta outweighs the frame itself.
+        kind = RECORD_KEYFRAME
+        payload = None
+        if (
+            self._last_text is not None
+            and len(text) == len(self._last_text)
+            and self._num_frames % self._keyframe_interval != 0
+        ):
+            kind = RECORD_DELTA
+            payload = _encode_delta(self._last_text, text)
+        if kind == RECORD_KEYFRAME or len(payload) > len(text):
+            kind = RECORD_KEYFRAME
+            payload = _encode_keyframe(text)
+            self._keyframes.append((self._num_frames, self._file.tell(),))
+
+        # Stream record to disk.
+        self._file.write(
+            RECORD_HEADER.pack(kind, self._num_frames, timestamp, len(payload))
+        )
+        self._file.write(payload)
+        self._last_text = text
+        self._num_frames += 1
+
+    def get_num_frames(self):
+        return self._num_frames
+
+    def close(self):
+        if self._file.closed:
+            return
+
+        # Append keyframe index, so that readers need not scan records.
+        index_offset = self._file.tell()
+        index = array(
+            'Q',
+            [
+                value
+                for keyframe
+                in self._keyframes
+                for value
+                in keyframe
+            ]
+        )
+        payload = _to_little_endian(index).tobytes()
+        self._file.write(
+            RECORD_HEADER.pack(
+                RECORD_INDEX,
+                self._num_frames,
+                0.0,
+                len(payload)
+            )
+        )
+        self._file.write(payload)
+        self._file.write(INDEX_TRAILER.pack(INDEX_MAGIC, index_offset))
+        self._file.close()
+
+
+class FrameReplay:
+    def __init__(self, filename):
+        # Map recording, so that seeking reads only the records needed.
+        with open(filename, 'rb') as f_in:
+            if os.fstat(f_in.fileno()).st_size < RECORDING_HEADER.size:
+                raise ValueError('Not a frame recording: {0}'.format(filename))
+            self._contents = mmap.mmap(
+                f_in.fileno(),
+                0,
+                access=mmap.ACCESS_READ
+            )
+        magic, version = RECORDING_HEADER.unpack_from(self._contents)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            self._contents.close()
+            raise ValueError('Not a frame recording: {0}'.format(filename))
+
+        # Load keyframe index, or rebuild it from an unfinished recording.
+        self._keyframes, self._num_frames = self._load_index()
+        self._keyframe_numbers = [frame for frame, offset in self._keyframes]
+
+        # Remember last decoded frame to replay sequentially in O(delta).
+        self._cursor = None
+
+    def get_num_frames(self):
+        return self._num_frames
+
+    def get_frame(self, frame_number):
+        timestamp, text = self._decode(frame_number)
+        return text
+
+    def get_timestamp(self, frame_number):
+        timestamp, text = self._decode(frame_number)
+        return timestamp
+
+    def close(self):
+        self._contents.close()
+
+    def __len__(self):
+        return self._num_frames
+
+    def __iter__(self):
+        for frame_number in range(self._num_frames):
+            yield self._decode(frame_number)
+
+    def _decode(self, frame_number):
+        if not 0 <= frame_number < self._num_frames:
+            raise IndexError('Frame out of range: {0}'.format(frame_number))
+
+        # Continue from cursor if possible, otherwise from nearest keyframe.
+        keyframe, keyframe_offset = self._keyframes[
+            bisect_right(self._keyframe_numbers, frame_number) - 1
+        ]
+        cursor = self._cursor
+        if cursor is None or not keyframe <= cursor[0] <= frame_number:
+            cursor = (keyframe - 1, None, None, keyframe_offset,)
+
+        # Apply records up to frame.
+        (
+            current,
+            timestamp,
+            text,
+            offset
+        ) = cursor
+        while current < frame_number:
+            kind, current, timestamp, size = RECORD_HEADER.unpack_from(
+                self._contents,
+                offset
+            )
+            offset += RECORD_HEADER.size
+            payload = self._contents[offset:offset + size]
+            offset += size
+            if kind == RECORD_KEYFRAME:
+                text = _decode_keyframe(payload)
+            else:
+                text = _decode_delta(text, payload)
+        self._cursor = (current, timestamp, text, offset,)
+
+        return timestamp, text
+
+    def _load_index(self):
+        # Read index through trailer.
+        contents = self._contents
+        if len(contents) >= RECORDING_HEADER.size + INDEX_TRAILER.size:
+            magic, index_offset = INDEX_TRAILER.unpack_from(
+                contents,
+                len(contents) - INDEX_TRAILER.size
+            )
+            if magic == INDEX_MAGIC:
+                kind, num_frames, timestamp, size = RECORD_HEADER.unpack_from(
+                    contents,
+                    index_offset
+                )
+                start = index_offset + RECORD_HEADER.size
+                index = _to_little_endian(
+                    array('Q', contents[start:start + size])
+                )
+                keyframes = [
+                    (index[i], index[i + 1],)
+                    for i
+                    in range(0, len(index), 2)
+                ]
+                return keyframes, num_frames
+
+        # Scan complete records.
+        keyframes = []
+        num_frames = 0
+        offset = RECORDING_HEADER.size
+        while offset + RECORD_HEADER.size <= len(contents):
+            kind, frame, timestamp, size = RECORD_HEADER.unpack_from(
+                contents,
+                offset
+            )
+            end = offset + RECORD_HEADER.size + size
+            if kind == RECORD_INDEX or end > len(contents):
+                break
+            if kind == RECORD_KEYFRAME:
+                keyframes.append((frame, offset,))
+            num_frames = frame + 1
+            offset = end
+
+        return keyframes, num_frames
+
+
+def _frame_text(frame):
+    # Flatten frame as printable string.
+    if type(frame) is str:
+        return frame
+
+    return '\n'.join(
+        ''.join(row)
+        for row
+        in frame[::-1]
+    )
+
+
+def _encode_keyframe(text):
+    # Run-length encode characters.
+    chars = []
+    lengths = array(_UINT32_TYPECODE)
+    for char, run in groupby(text):
+        chars.append(char)
+        lengths.append(sum(1 for _ in run))
+
+    return _pack_runs(lengths, ''.join(chars))
+
+
+def _decode_keyframe(payload):
+    lengths, chars = _unpack_runs(payload)
+
+    return ''.join(
+        chars[run] * lengths[run]
+        for run
+        in range(len(lengths))
+    )
+
+
+def _encode_delta(last_text, text):
+    # Encode runs of changed characters of changed rows.
+    bounds = array(_UINT32_TYPECODE)
+    chars = []
+    last_rows = last_text.split('\n')
+    rows = text.split('\n')
+    if list(map(len, rows)) != list(map(len, last_rows)):
+        # Rows moved, so compare frames whole.
+        last_rows = [last_text]
+        rows = [text]
+    offset = 0
+    for r in range(len(rows)):
+        if rows[r] != last_rows[r]:
+            for start, end in diff_runs(last_rows[r], rows[r], MAX_RUN_GAP):
+                bounds.append(offset + start)
+                bounds.append(end - start)
+                chars.append(rows[r][start:end])
+        offset += len(rows[r]) + 1
+
+    return _pack_runs(bounds, ''.join(chars))
+
+
+def _decode_delta(last_text, payload):
+    bounds, chars = _unpack_runs(payload)
+
+    # Splice changed runs into previous frame.
+    pieces = []
+    offset = 0
+    char_offset = 0
+    for run in range(0, len(bounds), 2):
+        start = bounds[run]
+        length = bounds[run + 1]
+        pieces.append(last_text[offset:start])
+        pieces.append(chars[char_offset:char_offset + length])
+        offset = start + length
+        char_offset += length
+    pieces.append(last_text[offset:])
+
+    return ''.join(pieces)
+
+
+def _pack_runs(values, chars):
+    return (
+        struct.pack('<I', len(values))
+        + _to_little_endian(values).tobytes()
+        + chars.encode('utf-8')
+    )
+
+
+def _unpack_runs(payload):
+    num_values = struct.unpack_from('<I', payload)[0]
+    start = struct.calcsize('<I')
+    end = start + num_values * 4
+    values = _to_little_endian(array(_UINT32_TYPECODE, payload[start:end]))
+
+    return values, payload[end:].decode('utf-8')
+
+
+def _to_little_endian(values):
+    # Store integers little-endian regardless of host.
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+
+    return values
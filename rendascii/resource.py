@@ -4,118 +4,813 @@ See file LICENSE.txt for full license details.
 """
 
 
+from array import array
+import heapq
 import json
-from rendascii.geometry import X
+import mmap
+from operator import add
+import os
+from rendascii.geometry import polygon, vector
+import re
+import struct
+import sys
+
+
+# Module constants.
+COMPILED_MODEL_EXT = '.rmc'
+COMPILED_MODEL_MAGIC = b'RASCIIMC'
+COMPILED_MODEL_HEADER = struct.Struct('<8sQQQQ')
+COMPILED_MODEL_VERSION = 1
+COLORMAP_CUBE_EXT = '.rcc'
+COLORMAP_CUBE_BITS = 5
+COLORMAP_CUBE_VERSION = 1
+_UINT32_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+
+class QuantizedColormap(dict):
+
+    def __init__(self, entries, cube):
+        super().__init__(entries)
+        self._cube = cube
+
+    def __missing__(self, color):
+        # Resolve color through the cube cell containing it.
+        return self._cube[
+            (color >> 9 & 0x7c00)
+            | (color >> 6 & 0x3e0)
+            | (color >> 3 & 0x1f)
+        ]
 
 
 def load_colormap(colormap_filename, colormap_dir):
     # Open file.
     colormap = {}
-    with open(colormap_dir + colormap_filename, 'r') as f_in:
+    colormap_path = colormap_dir + colormap_filename
+    with open(colormap_path, 'r') as f_in:
         raw_map = json.load(f_in)
-        for key in raw_map:
-            value = raw_map[key]
-            colormap[key.lower()] = '\0' if value == '' else value[0]
+        palette = raw_map.pop('palette', None)
+        for raw_entries in (palette or {}, raw_map,):
+            for key in raw_entries:
+                value = raw_entries[key]
+                colormap[int(key, 16)] = '\0' if value == '' else value[0]
+
+    # Resolve remaining colors to their nearest palette color.
+    if palette is not None:
+        colors = sorted(int(key, 16) for key in palette)
+        cube = _load_colormap_cube(colormap_path)
+        if cube is None:
+            cube = _gen_colormap_cube(colors, colormap)
+            try:
+                _save_colormap_cube(colormap_path, cube)
+            except OSError:
+                pass
+        colormap = QuantizedColormap(colormap, cube)
 
     return colormap
 
 
 def load_sprite(sprite_filename, sprite_dir):
-    # Initialize output data.
-    sprite = []
+    # Colors are keyed by 8-bit samples, binary and grayscale samples being
+    # scaled to 8 bits. ASCII pixmap (P3) samples are kept raw for
+    # compatibility with colormaps written for the original loader, so P3
+    # files with a maxval other than 255 key colors differently.
 
     # Open file.
-    with open(sprite_dir + sprite_filename, 'r') as ppm_f:
-        raw_contents = ppm_f.read()
-        # Strip comments from file and break it into words.
-        words = []
-        for line in raw_contents.splitlines():
-            if line[0] != '#':
-                words += line.split()
-        # Skip first word for now, which should be 'P3'.
-        # Get sprite width and height.
-        width = int(words[1])
-        height = int(words[2])
-        del words[0:4]
-
-        # Iterate over every row of the sprite.
-        for r in range(height):
-            start = r * width * 3
-            end = start + width * 3
-            row = []
-            # Iterate over every pixel in row.
-            for p in range(start, end, 3):
-                row.append(
-                    ''.join(
-                        [
-                            '{0:02x}'.format(int(words[c]))
-                            for c
-                            in range(p, p + 3)
-                        ]
-                    )
-                )
-            sprite.append(row)
+    with open(sprite_dir + sprite_filename, 'rb') as pnm_f:
+        contents = pnm_f.read()
 
-    return tuple(sprite[::-1])
+    # Decode header and pixel samples.
+    magic, width, height, maxval, offset = _read_pnm_header(contents)
+    channels = 3 if magic in (b'P3', b'P6',) else 1
+    num_samples = width * height * channels
+    if magic in (b'P1', b'P4',):
+        samples = _decode_pbm(contents, offset, magic, width, height)
+    else:
+        samples = _decode_samples(contents, offset, magic, maxval, num_samples)
 
+    # Pack samples into 24-bit colors in bulk.
+    if magic == b'P3' and maxval > 255:
+        # Concatenate wide ASCII samples as hexadecimal digits.
+        colors = [
+            int(
+                ''.join(
+                    '{0:02x}'.format(value)
+                    for value
+                    in samples[start:start + 3]
+                ),
+                16
+            )
+            for start
+            in range(0, num_samples, 3)
+        ]
+    else:
+        packed = bytearray(width * height * 4)
+        for channel in range(3):
+            packed[channel + 1::4] = samples[channel % channels::channels]
+        colors = array(_UINT32_TYPECODE, packed)
+        if sys.byteorder == 'little':
+            colors.byteswap()
+
+    # Index colors into a palette, storing rows as strings of palette indices
+    # so that they can be colormapped with str.translate.
+    palette = tuple(sorted(set(colors)))
+    index_chars = {
+        palette[index]: chr(index)
+        for index
+        in range(len(palette))
+    }
+    rows = tuple(
+        ''.join(map(index_chars.__getitem__, colors[start:start + width]))
+        for start
+        in range((height - 1) * width, -1, -width)
+    )
+
+    return palette, rows
+
+
+def load_model(
+    model_filename,
+    model_dir,
+    material_dir,
+    right_handed,
+    compact=False,
+    compiled=False
+):
+    # Load compiled model, (re)compiling it if missing or stale.
+    if compiled:
+        compiled_path = model_dir + model_filename + COMPILED_MODEL_EXT
+        model = _load_compiled_model(compiled_path, right_handed)
+        if model is None:
+            try:
+                compile_model(
+                    model_filename,
+                    model_dir,
+                    material_dir,
+                    right_handed
+                )
+            except OSError:
+                # Fall back to parsing if compiled model cannot be written.
+                compact = True
+            else:
+                model = _load_compiled_model(compiled_path, right_handed)
+        if model is not None:
+            return model
 
-def load_model(model_filename, model_dir, material_dir, right_handed):
     # Initialize output data.
-    vertices = []
-    faces = []
-    face_colors = []
+    if compact:
+        # Flat vertex (Nx3) and face (Mx3) arrays, plus material ids indexing
+        # a material color table.
+        vertices = array('d')
+        faces = array('i')
+        face_colors = array('i')
+        material_ids = {}
+        add_vertex = vertices.extend
+        add_face = faces.extend
+    else:
+        vertices = []
+        faces = []
+        face_colors = []
+        add_vertex = vertices.append
+        add_face = faces.append
+    add_face_color = face_colors.append
+    num_vertices = 0
 
-    # Open file.
-    materials = None
+    # Stream file, building output in a single pass.
+    materials = {}
     with open(model_dir + model_filename, 'r') as obj_f:
         cur_mtl = None
         for line in obj_f:
-            words = line.split()
-            if len(words) > 0:
-
-                # Check for vertex definition.
-                if words[0] == 'v':
-                    vertex = [
-                        float(component)
-                        for component
-                        in words[1:]
-                    ]
-                    # Flip X axis if right-handed model.
-                    if right_handed:
-                        vertex[X] = -vertex[X]
-                    vertices.append(tuple(vertex))
-
-                # Check for face definition.
-                elif words[0] == 'f':
-                    # Assign face color.
-                    face_colors.append(materials[cur_mtl])
-                    # Extract vertex indices.
-                    verts = []
-                    for component in words[1:]:
-                        vert_info = component.split('/')
-                        verts.append(int(vert_info[0]) - 1)
-                    # Reverse vertex order if right-handed model.
+            # Dispatch on keyword prefix, skipping texture coordinates,
+            # normals and unknown statements without splitting them.
+            line = line.lstrip()
+            keyword = line[:2]
+
+            # Check for vertex definition.
+            if keyword == 'v ' or keyword == 'v\t':
+                words = line.split()
+                # Flip X axis if right-handed model.
+                add_vertex(
+                    (
+                        -float(words[1]) if right_handed else float(words[1]),
+                        float(words[2]),
+                        float(words[3]),
+                    )
+                )
+                num_vertices += 1
+
+            # Check for face definition.
+            elif keyword == 'f ' or keyword == 'f\t':
+                words = line.split()
+                # Resolve absolute and relative (negative) vertex indices.
+                verts = []
+                for component in words[1:]:
+                    vert = int(component.partition('/')[0])
+                    vert = vert - 1 if vert > 0 else num_vertices + vert
+                    if not 0 <= vert < num_vertices:
+                        raise ValueError(
+                            'Invalid vertex index: {0}'.format(component)
+                        )
+                    verts.append(vert)
+                # Assign face color.
+                color = materials[cur_mtl]
+                if compact:
+                    if color not in material_ids:
+                        material_ids[color] = len(material_ids)
+                    color = material_ids[color]
+                # Triangulate face as a fan around its first vertex, reversing
+                # vertex order if right-handed model.
+                for v in range(1, len(verts) - 1):
                     if right_handed:
-                        verts = verts[::-1]
-                    # Construct face data.
-                    faces.append(tuple(verts))
+                        add_face((verts[v + 1], verts[v], verts[0],))
+                    else:
+                        add_face((verts[0], verts[v], verts[v + 1],))
+                    add_face_color(color)
 
-                # Check for material to use.
-                elif words[0] == 'usemtl':
+            # Check for material to use or material libraries.
+            elif line.startswith('usemtl') or line.startswith('mtllib'):
+                words = line.split()
+                if words[0] == 'usemtl':
                     cur_mtl = words[1]
-
-                # Check for material library.
                 elif words[0] == 'mtllib':
-                    materials = _load_materials(words[1], material_dir)
+                    for material_filename in words[1:]:
+                        materials.update(
+                            _load_materials(material_filename, material_dir)
+                        )
+
+    # Pack material table with compact face colors.
+    if compact:
+        face_colors = (
+            face_colors,
+            tuple(sorted(material_ids, key=material_ids.get)),
+        )
 
     # Pack output data.
     return (
-        tuple(vertices),
-        tuple(faces),
-        tuple(face_colors),
+        vertices if compact else tuple(vertices),
+        faces if compact else tuple(faces),
+        face_colors if compact else tuple(face_colors),
     )
 
 
+def compile_model(model_filename, model_dir, material_dir, right_handed):
+    # Load compact model data.
+    (
+        vertices,
+        faces,
+        (
+            face_colors,
+            materials
+        )
+    ) = load_model(
+        model_filename,
+        model_dir,
+        material_dir,
+        right_handed,
+        compact=True
+    )
+
+    # Sign compiled model with its sources and binary layout.
+    model_path = model_dir + model_filename
+    sources = [model_path]
+    with open(model_path, 'r') as obj_f:
+        for line in obj_f:
+            line = line.lstrip()
+            if line.startswith('mtllib'):
+                words = line.split()
+                if words[0] == 'mtllib':
+                    for material_filename in words[1:]:
+                        sources.append(material_dir + material_filename)
+    signature = _gen_compiled_signature(sources, right_handed)
+
+    # Encode header, signature, blocks and material table.
+    raw_signature = json.dumps(signature).encode('utf-8')
+    raw_materials = json.dumps(materials).encode('utf-8')
+    header = COMPILED_MODEL_HEADER.pack(
+        COMPILED_MODEL_MAGIC,
+        len(vertices) // 3,
+        len(faces) // 3,
+        len(raw_signature),
+        len(raw_materials)
+    )
+    padding = -(len(header) + len(raw_signature)) % vertices.itemsize
+
+    # Write file atomically, so that mapped older versions stay valid.
+    compiled_path = model_path + COMPILED_MODEL_EXT
+    with open(compiled_path + '.tmp', 'wb') as rmc_f:
+        rmc_f.write(header)
+        rmc_f.write(raw_signature)
+        rmc_f.write(b'\0' * padding)
+        rmc_f.write(vertices.tobytes())
+        rmc_f.write(faces.tobytes())
+        rmc_f.write(face_colors.tobytes())
+        rmc_f.write(raw_materials)
+    os.replace(compiled_path + '.tmp', compiled_path)
+
+
+def is_compact_model(model):
+    return type(model[0]) is not tuple
+
+
+def model_size(model):
+    # Compact models store vertices and faces in flat arrays of triplets.
+    if is_compact_model(model):
+        return len(model[0]) // 3, len(model[1]) // 3
+
+    return len(model[0]), len(model[1])
+
+
+def index_model_colors(model):
+    # Compact models already index a material color table.
+    if is_compact_model(model):
+        return model[2]
+
+    # Index distinct face colors into a material color table.
+    material_ids = {}
+    face_colors = array('i')
+    for color in model[2]:
+        if color not in material_ids:
+            material_ids[color] = len(material_ids)
+        face_colors.append(material_ids[color])
+
+    return (
+        face_colors,
+        tuple(material_ids),
+    )
+
+
+def model_bounds(model):
+    # Models without vertices have no bounds.
+    vertices = model[0]
+    if len(vertices) == 0:
+        return None
+
+    # Compact models store vertices in flat arrays of triplets.
+    if is_compact_model(model):
+        axes = tuple(
+            vertices[axis::3]
+            for axis
+            in range(3)
+        )
+    else:
+        axes = tuple(
+            tuple(
+                vertex[axis]
+                for vertex
+                in vertices
+            )
+            for axis
+            in range(3)
+        )
+
+    return (
+        tuple(min(axis) for axis in axes),
+        tuple(max(axis) for axis in axes),
+    )
+
+
+def decimate_model(model, ratio=0.5):
+    # Unpack model as lists of vertex positions and faces.
+    compact = is_compact_model(model)
+    num_vertices, num_polygons = model_size(model)
+    if compact:
+        positions = [
+            tuple(model[0][vertex * 3:vertex * 3 + 3])
+            for vertex
+            in range(num_vertices)
+        ]
+        faces = [
+            list(model[1][face * 3:face * 3 + 3])
+            for face
+            in range(num_polygons)
+        ]
+        face_colors, materials = model[2]
+    else:
+        positions = list(model[0])
+        faces = [
+            list(face)
+            for face
+            in model[1]
+        ]
+        face_colors = model[2]
+
+    # Map vertices to faces around them, and queue edges by length.
+    vertex_faces = [
+        set()
+        for vertex
+        in range(num_vertices)
+    ]
+    edges = []
+    for f in range(num_polygons):
+        face = faces[f]
+        for v in range(3):
+            vertex_faces[face[v]].add(f)
+            edges.append(
+                (
+                    vector.distance(
+                        positions[face[v]],
+                        positions[face[v - 1]]
+                    ),
+                    face[v],
+                    face[v - 1],
+                )
+            )
+    heapq.heapify(edges)
+
+    # Collapse shortest edges into their midpoints until enough faces have
+    # degenerated, skipping collapses which would flip faces.
+    alive = [True] * num_polygons
+    num_alive = num_polygons
+    roots = list(range(num_vertices))
+    while num_alive > num_polygons * ratio and len(edges) > 0:
+        length, a, b = heapq.heappop(edges)
+        a = _find_root(roots, a)
+        b = _find_root(roots, b)
+        if a == b:
+            continue
+        # Requeue edges whose length changed since queued.
+        current = vector.distance(positions[a], positions[b])
+        if current != length:
+            heapq.heappush(edges, (current, a, b,))
+            continue
+        midpoint = tuple(
+            (positions[a][axis] + positions[b][axis]) / 2
+            for axis
+            in range(3)
+        )
+        if _flips_faces(
+            positions,
+            faces,
+            alive,
+            vertex_faces[a] | vertex_faces[b],
+            (a, b,),
+            midpoint
+        ):
+            continue
+
+        # Merge vertex b into vertex a, dropping degenerate faces.
+        positions[a] = midpoint
+        roots[b] = a
+        for f in vertex_faces[b]:
+            if alive[f]:
+                face = faces[f]
+                face[face.index(b)] = a
+                if len(set(face)) < 3:
+                    alive[f] = False
+                    num_alive -= 1
+        vertex_faces[a] = set(
+            f
+            for f
+            in vertex_faces[a] | vertex_faces[b]
+            if alive[f]
+        )
+        vertex_faces[b] = set()
+
+        # Queue edges around merged vertex.
+        for f in vertex_faces[a]:
+            for v in faces[f]:
+                if v != a:
+                    heapq.heappush(
+                        edges,
+                        (vector.distance(positions[a], positions[v]), a, v,)
+                    )
+
+    # Reindex vertices of remaining faces.
+    indices = {}
+    out_vertices = []
+    out_faces = []
+    out_face_colors = []
+    for f in range(num_polygons):
+        if alive[f]:
+            for v in faces[f]:
+                if v not in indices:
+                    indices[v] = len(indices)
+                    out_vertices.append(positions[v])
+            out_faces.append(
+                tuple(
+                    indices[v]
+                    for v
+                    in faces[f]
+                )
+            )
+            out_face_colors.append(face_colors[f])
+
+    # Pack output data, compactly if decimating a compact model.
+    if compact:
+        return (
+            array('d', [
+                component
+                for vertex
+                in out_vertices
+                for component
+                in vertex
+            ]),
+            array('i', [
+                index
+                for face
+                in out_faces
+                for index
+                in face
+            ]),
+            (array('i', out_face_colors), materials,),
+        )
+
+    return (
+        tuple(out_vertices),
+        tuple(out_faces),
+        tuple(out_face_colors),
+    )
+
+
+def _read_pnm_header(contents):
+    # Read whitespace-separated header fields, skipping comments.
+    fields = []
+    offset = 0
+    num_fields = 3 if contents[:2] in (b'P1', b'P4',) else 4
+    while len(fields) < num_fields:
+        while contents[offset:offset + 1].isspace():
+            offset += 1
+        if contents[offset:offset + 1] == b'#':
+            offset = contents.index(b'\n', offset)
+            continue
+        end = offset
+        while end < len(contents) and not contents[end:end + 1].isspace():
+            if contents[end:end + 1] == b'#':
+                break
+            end += 1
+        fields.append(contents[offset:end])
+        offset = end
+
+    return (
+        fields[0],
+        int(fields[1]),
+        int(fields[2]),
+        int(fields[3]) if num_fields == 4 else 1,
+        offset,
+    )
+
+
+def _decode_samples(contents, offset, magic, maxval, num_samples):
+    # Precompute sample scaling to 8 bits.
+    scale = bytes(
+        round(value * 255 / maxval)
+        for value
+        in range(maxval + 1)
+    )
+
+    # Decode ASCII (P2, P3) or binary (P5, P6) samples.
+    if magic in (b'P2', b'P3',):
+        values = re.sub(rb'#[^\n]*', b'', contents[offset:]).split()
+        values = [int(value) for value in values[:num_samples]]
+        # ASCII pixmaps keep raw samples, which colormaps are keyed by.
+        if magic == b'P3':
+            return bytes(values) if maxval < 256 else values
+    elif maxval < 256:
+        # Binary raster starts after a single whitespace byte.
+        return contents[offset + 1:offset + 1 + num_samples].translate(
+            scale + bytes(256 - len(scale))
+        )
+    else:
+        values = array('H', contents[offset + 1:offset + 1 + num_samples * 2])
+        if sys.byteorder == 'little':
+            values.byteswap()
+
+    return bytes(scale[value] for value in values)
+
+
+def _decode_pbm(contents, offset, magic, width, height):
+    # Decode ASCII (P1) or packed binary (P4) bits, 1 being black.
+    if magic == b'P1':
+        bits = re.sub(rb'#[^\n]*|\s', b'', contents[offset:])
+        bits = bits[:width * height]
+    else:
+        # Unpack bytes through a lookup table, dropping row padding.
+        row_size = (width + 7) // 8
+        unpacked = tuple(
+            '{0:08b}'.format(value).encode('ascii')
+            for value
+            in range(256)
+        )
+        bits = b''.join(
+            b''.join(
+                unpacked[value]
+                for value
+                in contents[start:start + row_size]
+            )[:width]
+            for start
+            in range(offset + 1, offset + 1 + row_size * height, row_size)
+        )
+
+    return bits.translate(bytes.maketrans(b'01', b'\xff\x00'))
+
+
+def _load_compiled_model(compiled_path, right_handed):
+    # Map file.
+    try:
+        with open(compiled_path, 'rb') as rmc_f:
+            if os.fstat(rmc_f.fileno()).st_size < COMPILED_MODEL_HEADER.size:
+                return None
+            contents = mmap.mmap(rmc_f.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError:
+        return None
+    view = memoryview(contents)
+
+    # Unpack header.
+    (
+        magic,
+        num_vertices,
+        num_faces,
+        signature_size,
+        materials_size
+    ) = COMPILED_MODEL_HEADER.unpack_from(view)
+    offset = COMPILED_MODEL_HEADER.size
+
+    # Reject compiled model if its sources or binary layout changed, or if it
+    # is truncated or corrupt.
+    vert_size = array('d').itemsize
+    face_size = array('i').itemsize
+    valid = magic == COMPILED_MODEL_MAGIC
+    if valid:
+        try:
+            signature = json.loads(
+                bytes(view[offset:offset + signature_size]).decode('utf-8')
+            )
+            offset += signature_size
+            valid = signature == _gen_compiled_signature(
+                [source[0] for source in signature['sources']],
+                right_handed
+            )
+            offset += -offset % vert_size
+            materials_offset = (
+                offset
+                + num_vertices * 3 * vert_size
+                + num_faces * 4 * face_size
+            )
+            valid = valid and materials_offset + materials_size == len(view)
+            if valid:
+                materials = tuple(
+                    json.loads(
+                        bytes(
+                            view[
+                                materials_offset:
+                                materials_offset + materials_size
+                            ]
+                        ).decode('utf-8')
+                    )
+                )
+        except (IndexError, KeyError, TypeError, ValueError):
+            valid = False
+    if not valid:
+        view.release()
+        contents.close()
+        return None
+
+    # Reference blocks without copying them.
+    vertices = view[offset:offset + num_vertices * 3 * vert_size].cast('d')
+    offset += num_vertices * 3 * vert_size
+    faces = view[offset:offset + num_faces * 3 * face_size].cast('i')
+    offset += num_faces * 3 * face_size
+    face_colors = view[offset:offset + num_faces * face_size].cast('i')
+
+    # Pack output data.
+    return (
+        vertices,
+        faces,
+        (
+            face_colors,
+            materials,
+        ),
+    )
+
+
+def _gen_compiled_signature(sources, right_handed):
+    return {
+        'version': COMPILED_MODEL_VERSION,
+        'byteorder': sys.byteorder,
+        'itemsizes': [array('d').itemsize, array('i').itemsize],
+        'right_handed': right_handed,
+        'sources': _stat_sources(sources),
+    }
+
+
+def _gen_colormap_cube(colors, colormap):
+    # Precompute squared distances from each cell center along each axis.
+    shift = 8 - COLORMAP_CUBE_BITS
+    centers = range(1 << shift >> 1, 256, 1 << shift)
+    axes = tuple(
+        tuple(
+            [(center - (color >> channel & 0xff)) ** 2 for color in colors]
+            for center
+            in centers
+        )
+        for channel
+        in (16, 8, 0,)
+    )
+
+    # Resolve each cell center to its nearest palette color.
+    cube = []
+    for red_dists in axes[0]:
+        for green_dists in axes[1]:
+            partial_dists = list(map(add, red_dists, green_dists))
+            for blue_dists in axes[2]:
+                dists = list(map(add, partial_dists, blue_dists))
+                cube.append(colormap[colors[dists.index(min(dists))]])
+
+    return ''.join(cube)
+
+
+def _load_colormap_cube(colormap_path):
+    # Read cached cube.
+    try:
+        with open(colormap_path + COLORMAP_CUBE_EXT, 'r') as rcc_f:
+            cached = json.load(rcc_f)
+    except (OSError, ValueError):
+        return None
+
+    # Reject cached cube if its colormap changed or it is incomplete.
+    if (
+        type(cached) is not dict
+        or cached.get('signature') != _gen_cube_signature(colormap_path)
+        or type(cached.get('cube')) is not str
+        or len(cached['cube']) != 1 << COLORMAP_CUBE_BITS * 3
+    ):
+        return None
+
+    return cached['cube']
+
+
+def _save_colormap_cube(colormap_path, cube):
+    # Write file atomically, so that concurrent readers stay valid.
+    cube_path = colormap_path + COLORMAP_CUBE_EXT
+    with open(cube_path + '.tmp', 'w') as rcc_f:
+        json.dump(
+            {
+                'signature': _gen_cube_signature(colormap_path),
+                'cube': cube,
+            },
+            rcc_f
+        )
+    os.replace(cube_path + '.tmp', cube_path)
+
+
+def _gen_cube_signature(colormap_path):
+    return {
+        'version': COLORMAP_CUBE_VERSION,
+        'bits': COLORMAP_CUBE_BITS,
+        'sources': _stat_sources([colormap_path]),
+    }
+
+
+def _find_root(roots, vertex):
+    # Follow merged vertices to their root, compressing the path.
+    root = vertex
+    while roots[root] != root:
+        root = roots[root]
+    while roots[vertex] != root:
+        roots[vertex], vertex = root, roots[vertex]
+
+    return root
+
+
+def _flips_faces(positions, faces, alive, around, edge, midpoint):
+    # Faces around an edge flip if their normals reverse once both of its
+    # vertices move to the midpoint. Faces on the edge degenerate instead.
+    for f in around:
+        if alive[f]:
+            face = faces[f]
+            if edge[0] in face and edge[1] in face:
+                continue
+            poly = tuple(
+                positions[v]
+                for v
+                in face
+            )
+            moved = tuple(
+                midpoint if v in edge else positions[v]
+                for v
+                in face
+            )
+            if (
+                vector.dot(polygon.normal_3d(poly), polygon.normal_3d(moved))
+                < 0.0
+            ):
+                return True
+
+    return False
+
+
+def _stat_sources(sources):
+    # Identify sources by modification time and size.
+    source_stats = []
+    for source in sources:
+        try:
+            stats = os.stat(source)
+            source_stats.append([source, stats.st_mtime_ns, stats.st_size])
+        except OSError:
+            source_stats.append([source, None, None])
+
+    return source_stats
+
+
 def _load_materials(material_filename, material_dir):
     # Initialize output data.
     materials = {}
@@ -124,8 +819,10 @@ def _load_materials(material_filename, material_dir):
     with open(material_dir + material_filename, 'r') as mtl_f:
         cur_mtl = None
         for line in mtl_f:
-            words = line.split()
-            if len(words) > 0:
+            # Only split material names and diffuse colors.
+            line = line.lstrip()
+            if line.startswith('newmtl') or line.startswith('Kd'):
+                words = line.split()
 
                 # Check for new material.
                 if words[0] == 'newmtl':
@@ -133,12 +830,9 @@ def _load_materials(material_filename, material_dir):
 
                 # Check for material color (diffuse).
                 elif words[0] == 'Kd':
-                    materials[cur_mtl] = ''.join(
-                        [
-                            '{0:02x}'.format(round(float(component) * 255))
-                            for component
-                            in words[1:]
-                        ]
-                    )
+                    color = 0
+                    for component in words[1:4]:
+                        color = color << 8 | round(float(component) * 255)
+                    materials[cur_mtl] = color
 
     return materials
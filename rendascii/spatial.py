@@ -0,0 +1,193 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+from itertools import count
+import math
+from rendascii.geometry import BOX_INSIDE, BOX_OUTSIDE, X, Y, Z
+from rendascii.geometry import matrix, polygon
+
+
+# Module constants.
+CELL_SIZE = 1.0
+MAX_LEVEL = 16
+NODE_ITEMS = 0
+NODE_CHILDREN = 1
+NODE_COUNT = 2
+
+
+class LooseOctree:
+    def __init__(self, cell_size=CELL_SIZE, max_level=MAX_LEVEL):
+        # Initialize instance attributes. Nodes are hashed by level and cell,
+        # so that the tree is unbounded and only occupied nodes exist.
+        self._cell_size = cell_size
+        self._max_level = max_level
+        self._nodes = {}
+        self._roots = {}
+        self._items = {}
+        self._unbounded = {}
+        self._sequence = count()
+
+    def insert(self, item, bounds):
+        # Number items, so that queries return them in insertion order.
+        self._place(item, bounds, next(self._sequence))
+
+    def update(self, item, bounds):
+        key, sequence = self._items[item]
+        new_key = self._gen_key(bounds)
+        if new_key != key:
+            self._unplace(item)
+            self._place(item, bounds, sequence)
+
+    def remove(self, item):
+        self._unplace(item)
+        del self._items[item]
+
+    def query(self, transformation, planes):
+        # Traverse nodes whose loose bounds are not entirely outside any one
+        # plane, skipping tests of nodes entirely inside every plane.
+        found = dict(self._unbounded)
+        stack = list(self._roots)
+        while len(stack) > 0:
+            key = stack.pop()
+            node = self._nodes[key]
+            classification = polygon.classify_box_h(
+                matrix.transform_many_h(
+                    transformation,
+                    self._gen_node_corners(key)
+                ),
+                planes
+            )
+            if classification == BOX_INSIDE:
+                self._collect(key, found)
+            elif classification != BOX_OUTSIDE:
+                found.update(node[NODE_ITEMS])
+                stack += node[NODE_CHILDREN]
+
+        return sorted(found, key=found.get)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def _place(self, item, bounds, sequence):
+        key = self._gen_key(bounds)
+        self._items[item] = (key, sequence,)
+        if key is None:
+            self._unbounded[item] = sequence
+            return
+
+        # Link node to its ancestors, counting items within each subtree.
+        self._node(key)[NODE_ITEMS][item] = sequence
+        child = None
+        while key is not None:
+            node = self._node(key)
+            node[NODE_COUNT] += 1
+            if child is not None:
+                node[NODE_CHILDREN][child] = None
+            child = key
+            key = self._gen_parent_key(key)
+        self._roots[child] = None
+
+    def _unplace(self, item):
+        key, sequence = self._items[item]
+        if key is None:
+            del self._unbounded[item]
+            return
+
+        # Unlink nodes left empty from their ancestors.
+        del self._nodes[key][NODE_ITEMS][item]
+        child = None
+        while key is not None:
+            node = self._nodes[key]
+            if child is not None:
+                del node[NODE_CHILDREN][child]
+            node[NODE_COUNT] -= 1
+            child = None
+            if node[NODE_COUNT] == 0:
+                del self._nodes[key]
+                child = key
+            key = self._gen_parent_key(key)
+        if child is not None:
+            del self._roots[child]
+
+    def _node(self, key):
+        node = self._nodes.get(key)
+        if node is None:
+            node = [{}, {}, 0]
+            self._nodes[key] = node
+        return node
+
+    def _collect(self, key, found):
+        stack = [key]
+        while len(stack) > 0:
+            node = self._nodes[stack.pop()]
+            found.update(node[NODE_ITEMS])
+            stack += node[NODE_CHILDREN]
+
+    def _gen_key(self, bounds):
+        if bounds is None:
+            return None
+
+        # Place item in smallest cell at least as large as it, by its center.
+        # Loose bounds, twice the cell size, then contain the item.
+        extent = max(
+            bounds[1][axis] - bounds[0][axis]
+            for axis
+            in (X, Y, Z,)
+        )
+        level = 0
+        if extent > self._cell_size:
+            level = math.ceil(math.log2(extent / self._cell_size))
+            if extent > self._cell_size * 2 ** level:
+                level += 1
+        if level > self._max_level:
+            return None
+        cell_size = self._cell_size * 2 ** level
+
+        return (level,) + tuple(
+            math.floor((bounds[0][axis] + bounds[1][axis]) / 2 / cell_size)
+            for axis
+            in (X, Y, Z,)
+        )
+
+    def _gen_parent_key(self, key):
+        if key[0] == self._max_level:
+            return None
+
+        return (
+            key[0] + 1,
+            key[1] >> 1,
+            key[2] >> 1,
+            key[3] >> 1,
+        )
+
+    def _gen_node_corners(self, key):
+        # Loose bounds extend cell by half its size on every side.
+        cell_size = self._cell_size * 2 ** key[0]
+        (
+            x_s,
+            y_s,
+            z_s
+        ) = (
+            (key[axis + 1] - 0.5) * cell_size
+            for axis
+            in (X, Y, Z,)
+        )
+        x_e = x_s + 2 * cell_size
+        y_e = y_s + 2 * cell_size
+        z_e = z_s + 2 * cell_size
+
+        return tuple(
+            (x, y, z, 1.0,)
+            for x
+            in (x_s, x_e,)
+            for y
+            in (y_s, y_e,)
+            for z
+            in (z_s, z_e,)
+        )
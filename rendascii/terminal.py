@@ -0,0 +1,121 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+import os
+import sys
+
+
+# Module constants.
+ESC_CLEAR = '\x1b[H\x1b[2J'
+ESC_HIDE_CURSOR = '\x1b[?25l'
+ESC_SHOW_CURSOR = '\x1b[?25h'
+ESC_MOVE = '\x1b[{0};{1}H'
+MAX_RUN_GAP = 8
+
+
+class TerminalDisplay:
+    def __init__(self, stream=None, max_run_gap=MAX_RUN_GAP):
+        # Initialize instance attributes.
+        self._stream = sys.stdout if stream is None else stream
+        self._max_run_gap = max_run_gap
+        self._rows = None
+        self._size = None
+        self._started = False
+
+    def show(self, frame):
+        # Convert frame to rows of text, top to bottom.
+        if type(frame) is str:
+            rows = frame.split('\n')
+        else:
+            rows = [
+                ''.join(row)
+                for row
+                in frame[::-1]
+            ]
+
+        # Crop frame to terminal, so that rows neither wrap nor scroll.
+        size = self._query_size()
+        if size is not None:
+            rows = [
+                row[:size[0]]
+                for row
+                in rows[:size[1]]
+            ]
+
+        # Redraw everything after resizing, otherwise only changed runs.
+        out = []
+        if not self._started:
+            out.append(ESC_HIDE_CURSOR)
+            self._started = True
+        if (
+            self._rows is None
+            or size != self._size
+            or list(map(len, rows)) != list(map(len, self._rows))
+        ):
+            out.append(ESC_CLEAR)
+            for r in range(len(rows)):
+                out.append(ESC_MOVE.format(r + 1, 1))
+                out.append(rows[r])
+        else:
+            for r in range(len(rows)):
+                if rows[r] != self._rows[r]:
+                    for start, end in diff_runs(
+                        self._rows[r],
+                        rows[r],
+                        self._max_run_gap
+                    ):
+                        out.append(ESC_MOVE.format(r + 1, start + 1))
+                        out.append(rows[r][start:end])
+        self._rows = rows
+        self._size = size
+
+        # Write frame in one buffered write.
+        data = ''.join(out)
+        self._stream.write(data)
+        self._stream.flush()
+
+        return len(data)
+
+    def invalidate(self):
+        # Redraw everything on next frame.
+        self._rows = None
+
+    def close(self):
+        # Restore cursor below last frame.
+        out = ESC_SHOW_CURSOR
+        if self._rows is not None:
+            out = ESC_MOVE.format(len(self._rows) + 1, 1) + out
+        self._stream.write(out)
+        self._stream.flush()
+        self._rows = None
+        self._started = False
+
+    def _query_size(self):
+        # Query terminal size on every frame to handle resizing.
+        try:
+            return tuple(os.get_terminal_size(self._stream.fileno()))
+        except (AttributeError, OSError, ValueError):
+            return None
+
+
+def diff_runs(old_text, new_text, max_gap=0):
+    # Collect runs of changed characters, bridging unchanged gaps that are
+    # cheaper to rewrite than to skip.
+    runs = []
+    start = None
+    last = None
+    for col in range(len(new_text)):
+        if old_text[col] != new_text[col]:
+            if start is None:
+                start = col
+            elif col - last > max_gap:
+                runs.append((start, last + 1,))
+                start = col
+            last = col
+    if start is not None:
+        runs.append((start, last + 1,))
+
+    return runs
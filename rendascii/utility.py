@@ -4,11 +4,34 @@ See file LICENSE.txt for full license details.
 """
 
 
+from collections import deque
 from datetime import datetime
 from rendascii.geometry import matrix, vector
+import threading
 import time
 
 
+# Module constants.
+STATS_STAGES = (
+    'seed',
+    'stage_one',
+    'sync_one',
+    'stage_two',
+    'sync_two',
+    'stage_three',
+    'assemble',
+)
+STATS_COUNTS = (
+    'vertices',
+    'polygons',
+    'culled_polygons',
+    'rasterized_polygons',
+    'sprites',
+    'fragments',
+    'pickled_bytes',
+)
+
+
 class FrameRateManager:
     def __init__(self, max_fps=None, fps_interval=0.0):
         # Initialize instance attributes.
@@ -63,6 +86,130 @@ class FrameRateManager:
         return fps
 
 
+class RenderStats:
+    def __init__(
+        self,
+        frame_rate_manager=None,
+        window=60,
+        callback=None,
+        count_pickled_bytes=False
+    ):
+        # Initialize instance attributes.
+        self._frame_rate_manager = frame_rate_manager
+        self._count_pickled_bytes = count_pickled_bytes
+        self._callback = callback
+        self._frames = deque(maxlen=window)
+        self._total_frames = 0
+        self._lock = threading.Lock()
+
+    def get_total_frames(self):
+        return self._total_frames
+
+    def get_last_frame(self):
+        return self._frames[-1] if self._frames else None
+
+    def get_averages(self):
+        # Average frames within rolling window.
+        num_frames = len(self._frames)
+        if num_frames == 0:
+            return None
+        averages = {
+            'frame_time': sum(
+                frame['frame_time']
+                for frame
+                in self._frames
+            ) / num_frames,
+            'stage_times': {
+                name: sum(
+                    frame['stage_times'][name]
+                    for frame
+                    in self._frames
+                ) / num_frames
+                for name
+                in STATS_STAGES
+            },
+            'counts': {
+                name: sum(
+                    frame['counts'][name]
+                    for frame
+                    in self._frames
+                ) / num_frames
+                for name
+                in STATS_COUNTS
+            },
+        }
+
+        # Relate render time to frame-rate manager's frame time.
+        if self._frame_rate_manager is not None:
+            delta_time = sum(
+                frame['delta_time']
+                for frame
+                in self._frames
+            ) / num_frames
+            averages['delta_time'] = delta_time
+            averages['fps'] = self._frame_rate_manager.get_fps()
+            averages['render_share'] = (
+                averages['frame_time'] / delta_time
+                if delta_time > 0.0
+                else 0.0
+            )
+
+        return averages
+
+    def _begin_frame(self, seed_time=0.0):
+        return _FrameStats(seed_time, self._count_pickled_bytes)
+
+    def _end_frame(self, frame_stats):
+        # Record frame.
+        frame = {
+            'frame_time': sum(frame_stats.get_stage_times().values()),
+            'stage_times': frame_stats.get_stage_times(),
+            'counts': frame_stats.get_counts(),
+        }
+        if self._frame_rate_manager is not None:
+            frame['delta_time'] = self._frame_rate_manager.get_delta_time()
+        # Frames of several cameras may finish concurrently.
+        with self._lock:
+            self._frames.append(frame)
+            self._total_frames += 1
+
+        # Notify listener.
+        if self._callback is not None:
+            self._callback(frame)
+
+
+class _FrameStats:
+    def __init__(self, seed_time, count_pickled_bytes):
+        # Initialize instance attributes.
+        self._count_pickled_bytes = count_pickled_bytes
+        self._stage_times = dict.fromkeys(STATS_STAGES, 0.0)
+        self._stage_times['seed'] = seed_time
+        self._counts = dict.fromkeys(STATS_COUNTS, 0)
+        self._mark = time.perf_counter()
+
+    def lap(self, stage_name):
+        # Accumulate time since last mark into stage.
+        now = time.perf_counter()
+        self._stage_times[stage_name] += now - self._mark
+        self._mark = now
+
+    def skip(self):
+        # Exclude time since last mark, such as measurement overhead.
+        self._mark = time.perf_counter()
+
+    def count(self, count_name, value):
+        self._counts[count_name] += value
+
+    def get_stage_times(self):
+        return self._stage_times
+
+    def get_counts(self):
+        return self._counts
+
+    def get_count_pickled_bytes(self):
+        return self._count_pickled_bytes
+
+
 class Transformer:
     def __init__(self, inverse=False):
         # Initialize instance attributes.
@@ -24,6 +24,11 @@ setup_info = dict(
     author_email='garrett@fairburn.dev',
     license='MIT',
     packages=find_packages(),
+    entry_points={
+        'console_scripts': [
+            'rendascii-bench=rendascii.bench:main',
+            ],
+        },
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',
@@ -52,26 +57,56 @@ if PURE_PY_ENV_VAR not in os.environ:
         sources=['rendascii/interface.py',],
         extra_compile_args=['-O1',]
         ),
+      Extension(
+        'rendascii.recording',
+        sources=['rendascii/recording.py',],
+        extra_compile_args=['-O1',]
+        ),
       Extension(
         'rendascii.resource',
         sources=['rendascii/resource.py',],
         extra_compile_args=['-O1',]
         ),
+      Extension(
+        'rendascii.spatial',
+        sources=['rendascii/spatial.py',],
+        extra_compile_args=['-O1',]
+        ),
+      Extension(
+        'rendascii.terminal',
+        sources=['rendascii/terminal.py',],
+        extra_compile_args=['-O1',]
+        ),
       Extension(
         'rendascii.utility',
         sources=['rendascii/utility.py',],
         extra_compile_args=['-O1',]
         ),
+      Extension(
+        'rendascii.pipeline.raster',
+        sources=['rendascii/pipeline/raster.py',],
+        extra_compile_args=['-O1',]
+        ),
       Extension(
         'rendascii.pipeline.shader',
         sources=['rendascii/pipeline/shader.py',],
         extra_compile_args=['-O1',]
         ),
+      Extension(
+        'rendascii.pipeline.shared',
+        sources=['rendascii/pipeline/shared.py',],
+        extra_compile_args=['-O1',]
+        ),
       Extension(
         'rendascii.pipeline.stage',
         sources=['rendascii/pipeline/stage.py',],
         extra_compile_args=['-O1',]
         ),
+      Extension(
+        'rendascii.geometry.kernel',
+        sources=['rendascii/geometry/kernel.py',],
+        extra_compile_args=['-O1',]
+        ),
       Extension(
         'rendascii.geometry.matrix',
         sources=['rendascii/geometry/matrix.py',],
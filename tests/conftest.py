@@ -0,0 +1,176 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+import json
+import math
+import pytest
+from rendascii.interface import Engine
+from rendascii.utility import Transformer
+
+
+# Module constants.
+CUBE_OBJ = """mtllib cube.mtl
+v -1.0 -1.0 -1.0
+v -1.0 -1.0 1.0
+v -1.0 1.0 -1.0
+v -1.0 1.0 1.0
+v 1.0 -1.0 -1.0
+v 1.0 -1.0 1.0
+v 1.0 1.0 -1.0
+v 1.0 1.0 1.0
+usemtl red
+f 1 2 4 3
+usemtl green
+f 5 7 8 6
+usemtl blue
+f 1 5 6 2
+f 3 4 8 7
+usemtl red
+f 1 3 7 5
+f 2 6 8 4
+"""
+CUBE_MTL = """newmtl red
+Kd 1 0 0
+newmtl green
+Kd 0 1 0
+newmtl blue
+Kd 0 0 1
+"""
+COLORMAP = {
+    'ff0000': '#',
+    '00ff00': 'o',
+    '0000ff': '.',
+    '000000': '',
+}
+SPRITE_PPM = """P3
+# Sprite.
+4 3
+255
+255 0 0 0 255 0 0 0 255 0 0 0
+0 255 0 0 0 255 255 0 0 0 0 0
+0 0 255 255 0 0 0 255 0 0 0 0
+"""
+
+
+@pytest.fixture
+def resource_dir(tmp_path):
+    # Write resources shared by tests.
+    (tmp_path / 'cube.obj').write_text(CUBE_OBJ)
+    (tmp_path / 'cube.mtl').write_text(CUBE_MTL)
+    (tmp_path / 'colormap.json').write_text(json.dumps(COLORMAP))
+    (tmp_path / 'sprite.ppm').write_text(SPRITE_PPM)
+
+    return str(tmp_path) + '/'
+
+
+@pytest.fixture
+def render_frames(resource_dir):
+    def render(
+        compact=False,
+        compiled=False,
+        incremental=False,
+        asynchronous=False,
+        batched=False,
+        **kwargs
+    ):
+        # Build scene of models and a sprite seen by two cameras.
+        engine = Engine(
+            resource_dir,
+            resource_dir,
+            resource_dir,
+            resource_dir,
+            **kwargs
+        )
+        try:
+            engine.load_colormap('colormap', 'colormap.json')
+            engine.load_sprite('sprite', 'sprite.ppm')
+            engine.load_model(
+                'cube',
+                'cube.obj',
+                compact=compact,
+                compiled=compiled
+            )
+            instances = []
+            for index in range(3):
+                instance = engine.create_model_instance('cube', 'colormap')
+                instance.set_transformation(
+                    Transformer()
+                    .rotate(0.3 + index, (0.0, 1.0, 0.0,))
+                    .rotate(0.4 * index, (1.0, 0.0, 0.0,))
+                    .translate((-2.5 + 2.5 * index, -1.0 + 0.5 * index, 5.0,))
+                    .get_transformation()
+                )
+                instances.append(instance)
+            sprite = engine.create_sprite_instance('sprite', 'colormap')
+            sprite.set_transformation(
+                Transformer().translate((0.5, 0.5, 3.0,)).get_transformation()
+            )
+            cameras = (
+                engine.create_camera((60, 30,), incremental=incremental),
+                engine.create_camera(
+                    (41, 17,),
+                    fov=math.radians(90),
+                    ratio=2.0,
+                    incremental=incremental
+                ),
+            )
+            cameras[1].set_transformation(
+                Transformer(True)
+                .translate((0.0, 0.5, -1.0,))
+                .rotate(0.2, (0.0, 1.0, 0.0,))
+                .get_transformation()
+            )
+            overlay = [['\0'] * 60 for row in range(30)]
+            overlay[2][3] = 'X'
+
+            # Asynchronous frames snapshot the scene when requested.
+            if asynchronous:
+                render_frame = engine.render_frame_async
+            else:
+                render_frame = engine.render_frame
+
+            # Render frames, changing the scene between them.
+            if batched:
+                frames = list(engine.render_frames(cameras, as_str=True))
+            else:
+                frames = [
+                    render_frame(camera, as_str=True)
+                    for camera
+                    in cameras
+                ]
+            frames.append(render_frame(cameras[0], overlay, as_str=True))
+            instances[0].set_transformation(
+                Transformer().translate((0.0, 0.0, 2.5,)).get_transformation()
+            )
+            frames.append(render_frame(cameras[0], as_str=True))
+            sprite.hide()
+            frames.append(render_frame(cameras[1], as_str=True))
+            engine.delete_model_instance(instances[2])
+            if batched:
+                frames += engine.render_frames(
+                    cameras,
+                    (overlay, None,),
+                    as_str=True
+                )
+            else:
+                frames += [
+                    render_frame(cameras[0], overlay, as_str=True),
+                    render_frame(cameras[1], as_str=True),
+                ]
+            frames.append(render_frame(cameras[0], as_str=True))
+            if asynchronous:
+                frames = [frame.result() for frame in frames]
+        finally:
+            engine.close()
+
+        return frames
+
+    return render
+
+
+@pytest.fixture
+def reference_frames(render_frames):
+    return render_frames()
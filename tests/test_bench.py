@@ -0,0 +1,41 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+import json
+from rendascii import bench
+
+
+def test_bench_runs_every_scene(tmp_path):
+    output = str(tmp_path / 'results.json')
+    bench.main(
+        [
+            '--resolutions', '20x10',
+            '--frames', '2',
+            '--workers', '2',
+            '--grid-size', '4',
+            '--sphere-segments', '8',
+            '--sprites', '4',
+            '--output', output,
+        ]
+    )
+    with open(output, 'r') as f_in:
+        results = json.load(f_in)
+
+    # Every scene runs serially and in a pool.
+    assert sorted(
+        (run['scene'], run['mode'],)
+        for run
+        in results['runs']
+    ) == sorted(
+        (scene, mode,)
+        for scene
+        in bench.SCENES
+        for mode
+        in ('serial', 'pool',)
+    )
+    for run in results['runs']:
+        assert run['frame_min'] <= run['frame_mean'] <= run['frame_max']
+        assert run['counts']['fragments'] > 0
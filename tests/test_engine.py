@@ -0,0 +1,113 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+import pytest
+from rendascii.interface import Engine
+
+
+def test_engine_rejects_unknown_rasterizer():
+    with pytest.raises(ValueError):
+        Engine(rasterizer='unknown')
+
+
+@pytest.mark.parametrize('tile_size', (0, -1, 2.5, '8', None,))
+def test_engine_rejects_invalid_tile_size(tile_size):
+    with pytest.raises(ValueError):
+        Engine(tile_size=tile_size)
+
+
+@pytest.mark.parametrize('chunk_size', (0, -4, 2.5, '8', True,))
+def test_engine_rejects_invalid_chunk_size(chunk_size):
+    with pytest.raises(ValueError):
+        Engine(chunk_size=chunk_size)
+
+
+def test_engine_accepts_automatic_chunk_size():
+    Engine(chunk_size=None).close()
+
+
+@pytest.mark.parametrize('num_workers', (0, 2,))
+def test_incremental_rendering_matches_full(
+    render_frames,
+    reference_frames,
+    num_workers
+):
+    # Scene moves, hides and deletes instances between frames.
+    assert render_frames(
+        incremental=True,
+        num_workers=num_workers
+    ) == reference_frames
+
+
+def test_instance_cache_matches_uncached(render_frames, reference_frames):
+    assert render_frames(instance_cache=False) == reference_frames
+
+
+@pytest.mark.parametrize('num_workers', (0, 2,))
+def test_compact_models_match_plain(
+    render_frames,
+    reference_frames,
+    num_workers
+):
+    assert render_frames(
+        compact=True,
+        num_workers=num_workers
+    ) == reference_frames
+
+
+@pytest.mark.parametrize('num_workers', (0, 2,))
+def test_compiled_models_match_source(
+    render_frames,
+    reference_frames,
+    num_workers
+):
+    assert render_frames(
+        compiled=True,
+        num_workers=num_workers
+    ) == reference_frames
+
+
+@pytest.mark.parametrize('num_workers', (0, 2,))
+def test_asynchronous_rendering_matches_serial(
+    render_frames,
+    reference_frames,
+    num_workers
+):
+    # Scene changes before earlier frames finish in background.
+    assert render_frames(
+        asynchronous=True,
+        num_workers=num_workers
+    ) == reference_frames
+
+
+def test_close_shuts_down_background_rendering(resource_dir):
+    engine = Engine(resource_dir, resource_dir, resource_dir, resource_dir)
+    engine.load_colormap('colormap', 'colormap.json')
+    engine.load_model('cube', 'cube.obj')
+    engine.create_model_instance('cube', 'colormap')
+    camera = engine.create_camera((20, 10,))
+    frame = engine.render_frame_async(camera)
+    executor = engine._executor
+    engine.close()
+
+    # Pending frames finish, and no further work is accepted.
+    assert frame.done()
+    assert engine._executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(int)
+    engine.close()
+
+
+@pytest.mark.parametrize('num_workers', (0, 2,))
+def test_batched_rendering_matches_serial(
+    render_frames,
+    reference_frames,
+    num_workers
+):
+    assert render_frames(
+        batched=True,
+        num_workers=num_workers
+    ) == reference_frames
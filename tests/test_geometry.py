@@ -0,0 +1,261 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+import math
+import pytest
+import random
+import struct
+from rendascii.geometry import PLANE_NORMAL, PLANE_POINT
+from rendascii.geometry import kernel, matrix, polygon, vector
+
+
+# Module constants.
+SPECIAL_VALUES = (0.0, -0.0, 1.0, -1.0, 0.5, 1e-30, -1e30,)
+
+
+def _bits(value):
+    # Compare floats bit for bit, telling signed zeros apart.
+    if isinstance(value, (tuple, list,)):
+        return tuple(_bits(item) for item in value)
+
+    return struct.pack('<d', value)
+
+
+def _random_value(rng):
+    if rng.random() < 0.2:
+        return rng.choice(SPECIAL_VALUES)
+
+    return rng.uniform(-10.0, 10.0)
+
+
+def _random_vectors(rng, count, length):
+    return tuple(
+        tuple(_random_value(rng) for c in range(length))
+        for v
+        in range(count)
+    )
+
+
+def _random_matrices(rng):
+    # Pair arbitrary matrices with those the engine builds.
+    return (
+        _random_vectors(rng, 4, 4),
+        matrix.compose(
+            matrix.projection_h(0.1, 100.0, math.radians(70), 2.0),
+            matrix.translation_h((-1.5, 0.25, 4.0,)),
+        ),
+        matrix.compose(
+            matrix.rotation_h(rng.uniform(-3.0, 3.0), (0.0, 1.0, 0.0,)),
+            matrix.scaling_h(rng.uniform(0.1, 4.0)),
+        ),
+        matrix.IDENTITY_H,
+    )
+
+
+@pytest.fixture(params=(True, False,), ids=('numpy', 'python',))
+def use_numpy(request, monkeypatch):
+    # Exercise the pure Python fallback as well as numpy.
+    if request.param:
+        if matrix.numpy is None:
+            pytest.skip('numpy is not installed')
+    else:
+        monkeypatch.setattr(matrix, 'numpy', None)
+
+    return request.param
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('count', (0, 1, 5, matrix.NUMPY_MIN_VECTORS, 200,))
+def test_transform_many_matches_transform(use_numpy, seed, count):
+    rng = random.Random(seed)
+    vecs = _random_vectors(rng, count, 4)
+    for m in _random_matrices(rng):
+        expected = tuple(matrix.transform_h(m, vec) for vec in vecs)
+        assert _bits(matrix.transform_many_h(m, vecs)) == _bits(expected)
+        assert _bits(matrix.transform_many_h(m, list(vecs))) == _bits(
+            expected
+        )
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('count', (0, 1, 5, matrix.NUMPY_MIN_VECTORS, 200,))
+def test_transform_points_matches_transform(use_numpy, seed, count):
+    rng = random.Random(seed)
+    points = _random_vectors(rng, count, 3)
+    flat = tuple(
+        component
+        for point
+        in points
+        for component
+        in point
+    )
+    for m in _random_matrices(rng):
+        expected = tuple(
+            matrix.transform_h(m, point + (1.0,))
+            for point
+            in points
+        )
+        assert _bits(matrix.transform_points_h(m, points)) == _bits(expected)
+        assert _bits(matrix.transform_points_h(m, flat, True)) == _bits(
+            expected
+        )
+
+
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize('count', (1, 2, 3, 6,))
+def test_compose_many_matches_compose(seed, count):
+    rng = random.Random(seed)
+    matrices = tuple(
+        rng.choice(_random_matrices(rng))
+        for m
+        in range(count)
+    )
+
+    # Nest calls to compose from the right.
+    expected = matrices[-1]
+    for m in reversed(matrices[:-1]):
+        expected = matrix.compose(m, expected)
+    assert _bits(matrix.compose_many(matrices)) == _bits(expected)
+
+
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize(
+    'shape_a, shape_b',
+    (
+        ((4, 4,), (4, 4,),),
+        ((3, 4,), (4, 4,),),
+        ((4, 4,), (4, 2,),),
+        ((2, 3,), (3, 3,),),
+    )
+)
+def test_compose_matches_generic_product(seed, shape_a, shape_b):
+    rng = random.Random(seed)
+    matrix_a = _random_vectors(rng, *shape_a)
+    matrix_b = _random_vectors(rng, *shape_b)
+    expected = tuple(
+        tuple(
+            sum(
+                matrix_a[i][k] * matrix_b[k][j]
+                for k
+                in range(shape_b[0])
+            )
+            for j
+            in range(shape_b[1])
+        )
+        for i
+        in range(shape_a[0])
+    )
+    assert _bits(matrix.compose(matrix_a, matrix_b)) == _bits(expected)
+
+
+@pytest.mark.parametrize('seed', range(16))
+@pytest.mark.parametrize(
+    'length, add, subtract, multiply, dot, distance',
+    (
+        (
+            2,
+            kernel.add_2d,
+            kernel.subtract_2d,
+            kernel.multiply_2d,
+            kernel.dot_2d,
+            kernel.distance_2d,
+        ),
+        (
+            3,
+            kernel.add_3d,
+            kernel.subtract_3d,
+            kernel.multiply_3d,
+            kernel.dot_3d,
+            kernel.distance_3d,
+        ),
+        (
+            4,
+            kernel.add_h,
+            kernel.subtract_h,
+            kernel.multiply_h,
+            kernel.dot_h,
+            kernel.distance_h,
+        ),
+    ),
+    ids=('2d', '3d', 'h',)
+)
+def test_vector_kernels_match_generic(
+    seed,
+    length,
+    add,
+    subtract,
+    multiply,
+    dot,
+    distance
+):
+    rng = random.Random(seed)
+    vec_a, vec_b = _random_vectors(rng, 2, length)
+    scalar = _random_value(rng)
+    assert _bits(add(vec_a, vec_b)) == _bits(vector.add(vec_a, vec_b))
+    assert _bits(subtract(vec_b, vec_a)) == _bits(
+        vector.subtract(vec_b, vec_a)
+    )
+    assert _bits(multiply(vec_a, scalar)) == _bits(
+        vector.multiply(vec_a, scalar)
+    )
+    assert _bits(dot(vec_a, vec_b)) == _bits(vector.dot(vec_a, vec_b))
+    assert _bits(distance(vec_b, vec_a)) == _bits(
+        vector.distance(vec_b, vec_a)
+    )
+
+
+@pytest.mark.parametrize('seed', range(64))
+def test_triangle_kernels_match_generic(seed):
+    rng = random.Random(seed)
+    tri = _random_vectors(rng, 3, 2)
+    if seed % 4 == 0:
+        # Include degenerate triangles with shared vertices.
+        tri = (tri[0], tri[1], tri[rng.randrange(2)],)
+    point = rng.choice((_random_vectors(rng, 1, 2)[0],) + tri)
+    attributes = tuple(_random_value(rng) for c in range(3))
+    assert _bits(kernel.tri_aabb_2d(tri)) == _bits(
+        polygon.generate_aabb_2d(tri)
+    )
+    assert (
+        kernel.tri_contains_point_2d(tri, point)
+        == polygon.poly_contains_point_2d(tri, point)
+    )
+    assert _bits(kernel.edge_2d(point, tri[0], tri[1])) == _bits(
+        polygon._edge_2d(point, tri[0], tri[1])
+    )
+
+    # Degenerate triangles divide by zero either way.
+    try:
+        expected = polygon.interpolate_attribute_2d(tri, attributes, point)
+    except ZeroDivisionError:
+        with pytest.raises(ZeroDivisionError):
+            kernel.tri_interpolate_2d(tri, attributes, point)
+    else:
+        assert _bits(kernel.tri_interpolate_2d(tri, attributes, point)) == (
+            _bits(expected)
+        )
+
+    poly = _random_vectors(rng, 3, 3)
+    assert _bits(kernel.normal_3d(poly)) == _bits(polygon.normal_3d(poly))
+
+
+@pytest.mark.parametrize('seed', range(32))
+def test_plane_kernels_match_generic(seed):
+    rng = random.Random(seed)
+    vec, focus, point, normal = _random_vectors(rng, 4, 4)
+    if seed % 4 == 0:
+        # Include vectors parallel to plane.
+        normal = (0.0, 0.0, 1.0, 0.0,)
+        vec = vec[:2] + (focus[2], vec[3],)
+    plane = [None, None]
+    plane[PLANE_POINT] = point
+    plane[PLANE_NORMAL] = normal
+    assert _bits(kernel.plane_distance_h(vec, plane)) == _bits(
+        vector.dot(normal, vector.subtract(vec, point))
+    )
+    assert _bits(kernel.project_h(vec, focus, plane)) == _bits(
+        vector.project_h(vec, focus, plane)
+    )
@@ -0,0 +1,187 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+import math
+import pytest
+from rendascii import resource
+from rendascii.interface import Engine
+from rendascii.utility import Transformer
+
+
+# Module constants.
+SPHERE_SEGMENTS = 16
+
+
+@pytest.fixture
+def sphere_dir(resource_dir):
+    # Write UV sphere of quads, with triangle fans at its poles.
+    rings = SPHERE_SEGMENTS // 2
+    lines = ['mtllib cube.mtl', 'v 0.0 1.0 0.0',]
+    for ring in range(1, rings):
+        theta = math.pi * ring / rings
+        for segment in range(SPHERE_SEGMENTS):
+            phi = 2 * math.pi * segment / SPHERE_SEGMENTS
+            lines.append(
+                'v {0!r} {1!r} {2!r}'.format(
+                    math.sin(theta) * math.cos(phi),
+                    math.cos(theta),
+                    math.sin(theta) * math.sin(phi)
+                )
+            )
+    lines.append('v 0.0 -1.0 0.0')
+    bottom = 2 + (rings - 1) * SPHERE_SEGMENTS
+    for segment in range(SPHERE_SEGMENTS):
+        material = ('red', 'green', 'blue',)[segment % 3]
+        lines.append('usemtl {0}'.format(material))
+        following = (segment + 1) % SPHERE_SEGMENTS
+        lines.append('f 1 {0} {1}'.format(2 + following, 2 + segment))
+        for ring in range(rings - 2):
+            start = 2 + ring * SPHERE_SEGMENTS
+            lines.append(
+                'f {0} {1} {2} {3}'.format(
+                    start + segment,
+                    start + following,
+                    start + SPHERE_SEGMENTS + following,
+                    start + SPHERE_SEGMENTS + segment
+                )
+            )
+        start = 2 + (rings - 2) * SPHERE_SEGMENTS
+        lines.append(
+            'f {0} {1} {2}'.format(start + segment, start + following, bottom)
+        )
+    with open(resource_dir + 'sphere.obj', 'w') as obj_f:
+        obj_f.write('\n'.join(lines) + '\n')
+
+    return resource_dir
+
+
+def _faces(model):
+    # List faces of plain or compact models as index triplets.
+    if resource.is_compact_model(model):
+        return [
+            tuple(model[1][face * 3:face * 3 + 3])
+            for face
+            in range(len(model[1]) // 3)
+        ]
+
+    return [tuple(face) for face in model[1]]
+
+
+@pytest.mark.parametrize('compact', (False, True,))
+@pytest.mark.parametrize('ratio', (0.75, 0.5, 0.25,))
+def test_decimated_model_is_valid(sphere_dir, compact, ratio):
+    model = resource.load_model(
+        'sphere.obj',
+        sphere_dir,
+        sphere_dir,
+        False,
+        compact
+    )
+    num_vertices, num_polygons = resource.model_size(model)
+    decimated = resource.decimate_model(model, ratio)
+    num_decimated_vertices, num_decimated_polygons = resource.model_size(
+        decimated
+    )
+
+    # Faces reach their target, and every vertex is used.
+    assert 0 < num_decimated_polygons <= num_polygons * ratio
+    assert num_decimated_vertices < num_vertices
+    faces = _faces(decimated)
+    assert set(
+        vertex
+        for face
+        in faces
+        for vertex
+        in face
+    ) == set(range(num_decimated_vertices))
+
+    # No face is degenerate.
+    for face in faces:
+        assert len(set(face)) == 3
+    vertices = (
+        [
+            tuple(decimated[0][vertex * 3:vertex * 3 + 3])
+            for vertex
+            in range(num_decimated_vertices)
+        ]
+        if compact
+        else decimated[0]
+    )
+    for face in faces:
+        (
+            vert_a,
+            vert_b,
+            vert_c
+        ) = (vertices[vertex] for vertex in face)
+        edge_a = tuple(vert_b[axis] - vert_a[axis] for axis in range(3))
+        edge_b = tuple(vert_c[axis] - vert_a[axis] for axis in range(3))
+        assert any(
+            edge_a[axis - 1] * edge_b[axis - 2]
+            - edge_a[axis - 2] * edge_b[axis - 1] != 0.0
+            for axis
+            in range(3)
+        )
+
+    # Faces keep colors of the original model.
+    colors = resource.index_model_colors(decimated)
+    assert len(colors[0]) == num_decimated_polygons
+    assert set(
+        colors[1][material]
+        for material
+        in colors[0]
+    ) <= set(resource.index_model_colors(model)[1])
+
+
+def test_compact_decimation_matches_plain(sphere_dir):
+    plain, compact = (
+        resource.decimate_model(
+            resource.load_model(
+                'sphere.obj',
+                sphere_dir,
+                sphere_dir,
+                False,
+                compact
+            )
+        )
+        for compact
+        in (False, True,)
+    )
+
+    assert _faces(compact) == _faces(plain)
+    assert list(compact[0]) == [
+        component
+        for vertex
+        in plain[0]
+        for component
+        in vertex
+    ]
+
+
+def test_levels_of_detail_are_selected_by_size(sphere_dir):
+    engine = Engine(sphere_dir, sphere_dir, sphere_dir, sphere_dir)
+    try:
+        engine.load_colormap('colormap', 'colormap.json')
+        engine.load_model('sphere', 'sphere.obj', lod_levels=3, lod_size=16)
+        models = engine._model_lods['sphere'][0]
+        assert len(models) == 4
+        sizes = [resource.model_size(model)[1] for model in models]
+        assert sizes == sorted(sizes, reverse=True)
+        assert len(set(sizes)) == len(sizes)
+
+        # Farther instances use coarser levels.
+        for z in (2.0, 8.0, 40.0,):
+            instance = engine.create_model_instance('sphere', 'colormap')
+            instance.set_transformation(
+                Transformer().translate((0.0, 0.0, z,)).get_transformation()
+            )
+        camera = engine.create_camera((80, 40,), far=100.0)
+        levels = [row[3] for row in engine._plan_model_instances(camera)]
+        assert levels[0] == 0
+        assert levels == sorted(levels)
+        assert levels[-1] > 0
+        assert len(engine.render_frame(camera, as_str=True)) > 0
+    finally:
+        engine.close()
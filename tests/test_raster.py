@@ -0,0 +1,34 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+import pytest
+from rendascii.pipeline import raster
+from rendascii.pipeline import RASTER_NUMPY, RASTER_SCANLINE
+
+
+def test_frames_are_not_blank(reference_frames):
+    assert len(set(reference_frames[0]) - {' ', '\n'}) > 1
+    for frame in reference_frames:
+        assert len(set(frame) - {' ', '\n'}) > 0
+
+
+def test_numpy_rasterizer_matches_fragment(render_frames, reference_frames):
+    if not raster.numpy_available():
+        pytest.skip('NumPy is not available')
+
+    assert render_frames(rasterizer=RASTER_NUMPY) == reference_frames
+
+
+def test_scanline_rasterizer_matches_fragment(
+    render_frames,
+    reference_frames
+):
+    assert render_frames(rasterizer=RASTER_SCANLINE) == reference_frames
+
+
+@pytest.mark.parametrize('tile_size', (1, 3, 64,))
+def test_tile_sizes_match(render_frames, reference_frames, tile_size):
+    assert render_frames(tile_size=tile_size) == reference_frames
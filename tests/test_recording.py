@@ -0,0 +1,124 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+import pytest
+from rendascii import recording
+from rendascii.recording import FrameRecorder, FrameReplay
+
+
+def _record(filename, frames, keyframe_interval=3):
+    recorder = FrameRecorder(filename, keyframe_interval=keyframe_interval)
+    for frame in frames:
+        recorder.record(frame)
+    recorder.close()
+
+
+@pytest.mark.parametrize('keyframe_interval', (1, 3, 60,))
+def test_replay_matches_rendered_frames(
+    tmp_path,
+    reference_frames,
+    keyframe_interval
+):
+    filename = str(tmp_path / 'frames.rfr')
+    _record(filename, reference_frames, keyframe_interval)
+
+    replay = FrameReplay(filename)
+    try:
+        assert len(replay) == replay.get_num_frames() == len(reference_frames)
+
+        # Replay sequentially, then seek backwards and forwards.
+        records = list(replay)
+        assert [text for timestamp, text in records] == reference_frames
+        assert [timestamp for timestamp, text in records] == sorted(
+            timestamp
+            for timestamp, text
+            in records
+        )
+        for frame_number in (5, 0, 7, 2, 2, 6, 1,):
+            assert replay.get_frame(frame_number) == (
+                reference_frames[frame_number]
+            )
+            assert replay.get_timestamp(frame_number) == (
+                records[frame_number][0]
+            )
+        with pytest.raises(IndexError):
+            replay.get_frame(len(reference_frames))
+    finally:
+        replay.close()
+
+
+def test_row_lists_are_recorded_as_text(tmp_path):
+    filename = str(tmp_path / 'frames.rfr')
+    _record(filename, ([['d', 'e', 'f'], ['a', 'b', 'c']],))
+
+    replay = FrameReplay(filename)
+    try:
+        assert replay.get_frame(0) == 'abc\ndef'
+    finally:
+        replay.close()
+
+
+def test_truncated_recordings_replay_complete_frames(
+    tmp_path,
+    reference_frames
+):
+    filename = str(tmp_path / 'frames.rfr')
+    _record(filename, reference_frames)
+    with open(filename, 'rb') as f_in:
+        contents = f_in.read()
+
+    # Without its index, a recording is scanned up to its last whole frame.
+    truncated_filename = str(tmp_path / 'truncated.rfr')
+    num_frames = set()
+    for length in range(
+        recording.RECORDING_HEADER.size,
+        len(contents),
+        (len(contents) - recording.RECORDING_HEADER.size) // 50
+    ):
+        with open(truncated_filename, 'wb') as f_out:
+            f_out.write(contents[:length])
+        replay = FrameReplay(truncated_filename)
+        try:
+            assert [text for timestamp, text in replay] == (
+                reference_frames[:len(replay)]
+            )
+            num_frames.add(len(replay))
+        finally:
+            replay.close()
+    assert num_frames == set(range(len(reference_frames) + 1))
+
+    # Unclosed recordings are scanned the same way.
+    recorder = FrameRecorder(truncated_filename, keyframe_interval=3)
+    for frame in reference_frames:
+        recorder.record(frame)
+    recorder._file.flush()
+    replay = FrameReplay(truncated_filename)
+    try:
+        assert [text for timestamp, text in replay] == reference_frames
+    finally:
+        replay.close()
+        recorder.close()
+
+
+@pytest.mark.parametrize(
+    'contents',
+    (
+        b'',
+        b'RASCII',
+        recording.RECORDING_HEADER.pack(b'NOTFRAME', 1),
+        recording.RECORDING_HEADER.pack(
+            recording.RECORDING_MAGIC,
+            recording.RECORDING_VERSION + 1
+        ),
+    )
+)
+def test_replay_rejects_other_files(tmp_path, contents):
+    filename = str(tmp_path / 'other.rfr')
+    with open(filename, 'wb') as f_out:
+        f_out.write(contents)
+
+    with pytest.raises(ValueError):
+        FrameReplay(filename)
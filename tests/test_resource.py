@@ -0,0 +1,390 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+import json
+import os
+import pytest
+from rendascii import resource
+
+
+def _flatten_model(model):
+    # Compare plain, compact and compiled models by their contents.
+    if resource.is_compact_model(model):
+        material_ids, materials = model[2]
+        return (
+            list(model[0]),
+            list(model[1]),
+            [materials[material] for material in material_ids],
+        )
+
+    return (
+        [component for vertex in model[0] for component in vertex],
+        [vert for face in model[1] for vert in face],
+        list(model[2]),
+    )
+
+
+def test_load_model_accepts_indented_lines(resource_dir):
+    with open(resource_dir + 'cube.obj', 'r') as obj_f:
+        lines = obj_f.readlines()
+    with open(resource_dir + 'indented.obj', 'w') as obj_f:
+        obj_f.writelines('  \t' + line for line in lines)
+
+    for compact in (False, True,):
+        assert resource.load_model(
+            'indented.obj',
+            resource_dir,
+            resource_dir,
+            False,
+            compact
+        ) == resource.load_model(
+            'cube.obj',
+            resource_dir,
+            resource_dir,
+            False,
+            compact
+        )
+
+
+def test_load_model_skips_other_statements(resource_dir):
+    with open(resource_dir + 'cube.obj', 'r') as obj_f:
+        lines = obj_f.readlines()
+    with open(resource_dir + 'attributes.obj', 'w') as obj_f:
+        obj_f.write('# Comment.\no cube\n')
+        for line in lines:
+            obj_f.write(line)
+            obj_f.write('vt 0.5 0.5\nvn 0.0 1.0 0.0\nvp 0.5\ns off\n')
+
+    assert resource.load_model(
+        'attributes.obj',
+        resource_dir,
+        resource_dir,
+        False
+    ) == resource.load_model('cube.obj', resource_dir, resource_dir, False)
+
+
+def test_load_model_rejects_face_index_zero(resource_dir):
+    with open(resource_dir + 'zero.obj', 'w') as obj_f:
+        obj_f.write(
+            'mtllib cube.mtl\n'
+            'v 0.0 0.0 0.0\n'
+            'v 1.0 0.0 0.0\n'
+            'v 0.0 1.0 0.0\n'
+            'usemtl red\n'
+            'f 0 1 2\n'
+        )
+
+    with pytest.raises(ValueError):
+        resource.load_model('zero.obj', resource_dir, resource_dir, False)
+
+
+@pytest.mark.parametrize('face', ('f -5 -4 -3', 'f 1 2 7', 'f 1 2 -4',))
+def test_load_model_rejects_out_of_range_indices(resource_dir, face):
+    with open(resource_dir + 'range.obj', 'w') as obj_f:
+        obj_f.write(
+            'mtllib cube.mtl\n'
+            'v 0.0 0.0 0.0\n'
+            'v 1.0 0.0 0.0\n'
+            'v 0.0 1.0 0.0\n'
+            'usemtl red\n'
+            '{0}\n'.format(face)
+        )
+
+    for compact in (False, True,):
+        with pytest.raises(ValueError):
+            resource.load_model(
+                'range.obj',
+                resource_dir,
+                resource_dir,
+                False,
+                compact
+            )
+
+
+def test_load_model_resolves_relative_indices(resource_dir):
+    with open(resource_dir + 'relative.obj', 'w') as obj_f:
+        obj_f.write(
+            'mtllib cube.mtl\n'
+            'v 0.0 0.0 0.0\n'
+            'v 1.0 0.0 0.0\n'
+            'v 0.0 1.0 0.0\n'
+            'usemtl red\n'
+            'f -3 -2/1 -1/1/1\n'
+        )
+
+    model = resource.load_model(
+        'relative.obj',
+        resource_dir,
+        resource_dir,
+        False
+    )
+    assert tuple(model[1]) == ((0, 1, 2,),)
+
+
+@pytest.mark.parametrize('right_handed', (False, True,))
+def test_compact_model_matches_plain(resource_dir, right_handed):
+    assert _flatten_model(
+        resource.load_model(
+            'cube.obj',
+            resource_dir,
+            resource_dir,
+            right_handed,
+            compact=True
+        )
+    ) == _flatten_model(
+        resource.load_model(
+            'cube.obj',
+            resource_dir,
+            resource_dir,
+            right_handed
+        )
+    )
+
+
+@pytest.mark.parametrize('right_handed', (False, True,))
+def test_compiled_model_matches_source(resource_dir, right_handed):
+    source = resource.load_model(
+        'cube.obj',
+        resource_dir,
+        resource_dir,
+        right_handed
+    )
+    model = resource.load_model(
+        'cube.obj',
+        resource_dir,
+        resource_dir,
+        right_handed,
+        compiled=True
+    )
+    assert _flatten_model(model) == _flatten_model(source)
+
+
+def test_compiled_model_signs_every_material_library(resource_dir):
+    with open(resource_dir + 'extra.mtl', 'w') as mtl_f:
+        mtl_f.write('newmtl extra\nKd 1 1 1\n')
+    with open(resource_dir + 'cube.obj', 'r') as obj_f:
+        contents = obj_f.read()
+    with open(resource_dir + 'libs.obj', 'w') as obj_f:
+        obj_f.write(contents.replace('cube.mtl', 'cube.mtl extra.mtl'))
+    resource.compile_model('libs.obj', resource_dir, resource_dir, False)
+    compiled_path = resource_dir + 'libs.obj' + resource.COMPILED_MODEL_EXT
+
+    # Touching the second library invalidates the compiled model.
+    assert resource._load_compiled_model(compiled_path, False) is not None
+    stats = os.stat(resource_dir + 'extra.mtl')
+    os.utime(
+        resource_dir + 'extra.mtl',
+        ns=(stats.st_atime_ns, stats.st_mtime_ns + 10 ** 9,)
+    )
+    assert resource._load_compiled_model(compiled_path, False) is None
+
+
+@pytest.mark.parametrize('length', (40, 60, 100, -3,))
+def test_compiled_model_recovers_from_truncation(resource_dir, length):
+    source = resource.load_model('cube.obj', resource_dir, resource_dir, False)
+    resource.compile_model('cube.obj', resource_dir, resource_dir, False)
+    compiled_path = resource_dir + 'cube.obj' + resource.COMPILED_MODEL_EXT
+    with open(compiled_path, 'rb') as rmc_f:
+        contents = rmc_f.read()
+    with open(compiled_path, 'wb') as rmc_f:
+        rmc_f.write(contents[:length])
+
+    # Truncated model is recompiled and its cache rewritten.
+    model = resource.load_model(
+        'cube.obj',
+        resource_dir,
+        resource_dir,
+        False,
+        compiled=True
+    )
+    assert _flatten_model(model) == _flatten_model(source)
+    with open(compiled_path, 'rb') as rmc_f:
+        assert rmc_f.read() == contents
+
+
+def test_compiled_model_recovers_from_corrupt_signature(resource_dir):
+    resource.compile_model('cube.obj', resource_dir, resource_dir, False)
+    compiled_path = resource_dir + 'cube.obj' + resource.COMPILED_MODEL_EXT
+    with open(compiled_path, 'rb') as rmc_f:
+        contents = rmc_f.read()
+    offset = resource.COMPILED_MODEL_HEADER.size
+    with open(compiled_path, 'wb') as rmc_f:
+        rmc_f.write(contents[:offset] + b'\xff' * 8 + contents[offset + 8:])
+
+    resource.load_model(
+        'cube.obj',
+        resource_dir,
+        resource_dir,
+        False,
+        compiled=True
+    )
+    with open(compiled_path, 'rb') as rmc_f:
+        assert rmc_f.read() == contents
+
+
+@pytest.mark.parametrize('maxval', (1, 15, 255, 1000,))
+def test_load_sprite_keeps_raw_ascii_samples(resource_dir, maxval):
+    samples = [
+        (index * 7) % (maxval + 1)
+        for index
+        in range(4 * 3 * 3)
+    ]
+    with open(resource_dir + 'raw.ppm', 'w') as ppm_f:
+        ppm_f.write(
+            'P3\n# Raw.\n4 3\n{0}\n{1}\n'.format(
+                maxval,
+                ' '.join(map(str, samples))
+            )
+        )
+
+    # Colors concatenate samples as hexadecimal digits, bottom row first.
+    expected = [
+        [
+            int(
+                ''.join(
+                    '{0:02x}'.format(value)
+                    for value
+                    in samples[pixel * 3:pixel * 3 + 3]
+                ),
+                16
+            )
+            for pixel
+            in range(row * 4, row * 4 + 4)
+        ]
+        for row
+        in range(2, -1, -1)
+    ]
+    palette, rows = resource.load_sprite('raw.ppm', resource_dir)
+    assert [[palette[ord(char)] for char in row] for row in rows] == expected
+
+
+def test_load_sprite_scales_binary_samples(resource_dir):
+    with open(resource_dir + 'binary.ppm', 'wb') as ppm_f:
+        ppm_f.write(b'P6\n1 1\n15\n' + bytes((15, 0, 5,)))
+
+    palette, rows = resource.load_sprite('binary.ppm', resource_dir)
+    assert palette[ord(rows[0][0])] == 0xff0055
+
+
+def test_load_sprite_keys_ascii_and_binary_alike_at_full_scale(resource_dir):
+    samples = (255, 0, 85, 15, 0, 5,)
+    with open(resource_dir + 'ascii.ppm', 'w') as ppm_f:
+        ppm_f.write('P3\n2 1\n255\n{0}\n'.format(' '.join(map(str, samples))))
+    with open(resource_dir + 'binary.ppm', 'wb') as ppm_f:
+        ppm_f.write(b'P6\n2 1\n255\n' + bytes(samples))
+
+    assert resource.load_sprite(
+        'ascii.ppm',
+        resource_dir
+    ) == resource.load_sprite(
+        'binary.ppm',
+        resource_dir
+    )
+
+
+def test_load_sprite_decodes_ascii_and_packed_bitmaps_alike(resource_dir):
+    with open(resource_dir + 'ascii.pbm', 'w') as pbm_f:
+        pbm_f.write('P1\n# Bits.\n10 2\n1010101010\n0000011111\n')
+    with open(resource_dir + 'packed.pbm', 'wb') as pbm_f:
+        pbm_f.write(b'P4\n10 2\n' + bytes((0xaa, 0x80, 0x07, 0xc0,)))
+
+    palette, rows = resource.load_sprite('ascii.pbm', resource_dir)
+    assert resource.load_sprite('packed.pbm', resource_dir) == (palette, rows)
+    assert [palette[ord(char)] for char in rows[1]] == [
+        0x000000 if bit == '1' else 0xffffff
+        for bit
+        in '1010101010'
+    ]
+
+
+def _write_palette_colormap(resource_dir):
+    with open(resource_dir + 'palette.json', 'w') as json_f:
+        json.dump(
+            {
+                'palette': {
+                    '000000': ' ',
+                    'ff0000': 'r',
+                    '00ff00': 'g',
+                    '0000ff': 'b',
+                    'ffffff': 'w',
+                    '808080': '.',
+                },
+                '123456': 'x',
+            },
+            json_f
+        )
+
+
+def test_quantized_colormap_matches_nearest_palette_color(resource_dir):
+    _write_palette_colormap(resource_dir)
+    colormap = resource.load_colormap('palette.json', resource_dir)
+    colors = sorted(
+        int(key, 16)
+        for key
+        in ('000000', 'ff0000', '00ff00', '0000ff', 'ffffff', '808080',)
+    )
+
+    # Exact entries take precedence over the cube.
+    assert colormap[0x123456] == 'x'
+    assert colormap[0xff0000] == 'r'
+
+    # Cell centers of the cube resolve to their nearest palette color.
+    shift = 8 - resource.COLORMAP_CUBE_BITS
+    centers = range(1 << shift >> 1, 256, 1 << shift)
+    for red in centers:
+        for green in centers:
+            for blue in centers:
+                dists = [
+                    (red - (color >> 16 & 0xff)) ** 2
+                    + (green - (color >> 8 & 0xff)) ** 2
+                    + (blue - (color & 0xff)) ** 2
+                    for color
+                    in colors
+                ]
+                nearest = colors[dists.index(min(dists))]
+                color = red << 16 | green << 8 | blue
+                assert colormap[color] == colormap[nearest]
+
+
+def test_quantized_colormap_cube_is_cached(resource_dir, monkeypatch):
+    _write_palette_colormap(resource_dir)
+    cube_path = resource_dir + 'palette.json' + resource.COLORMAP_CUBE_EXT
+    colormap = resource.load_colormap('palette.json', resource_dir)
+    assert os.path.exists(cube_path)
+
+    # Reloading reads the cached cube instead of generating it.
+    def fail(colors, colormap):
+        raise AssertionError('Cube regenerated')
+    monkeypatch.setattr(resource, '_gen_colormap_cube', fail)
+    reloaded = resource.load_colormap('palette.json', resource_dir)
+    assert reloaded._cube == colormap._cube
+    monkeypatch.undo()
+
+    # Changed colormaps and corrupt caches are regenerated.
+    stats = os.stat(resource_dir + 'palette.json')
+    os.utime(
+        resource_dir + 'palette.json',
+        ns=(stats.st_atime_ns, stats.st_mtime_ns + 10 ** 9,)
+    )
+    assert resource._load_colormap_cube(
+        resource_dir + 'palette.json'
+    ) is None
+    assert resource.load_colormap(
+        'palette.json',
+        resource_dir
+    )._cube == colormap._cube
+    with open(cube_path, 'r') as rcc_f:
+        cached = json.load(rcc_f)
+    cached['cube'] = cached['cube'][:100]
+    with open(cube_path, 'w') as rcc_f:
+        json.dump(cached, rcc_f)
+    assert resource._load_colormap_cube(
+        resource_dir + 'palette.json'
+    ) is None
+    assert resource.load_colormap(
+        'palette.json',
+        resource_dir
+    )._cube == colormap._cube
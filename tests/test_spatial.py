@@ -0,0 +1,92 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+import math
+import pytest
+from rendascii.interface import Engine
+from rendascii.spatial import LooseOctree
+from rendascii.utility import Transformer
+
+
+def _render_grid(resource_dir, spatial_index):
+    # Build grid of cubes, most of which lie outside the view frustum.
+    engine = Engine(
+        resource_dir,
+        resource_dir,
+        resource_dir,
+        resource_dir,
+        spatial_index=spatial_index
+    )
+    try:
+        engine.load_colormap('colormap', 'colormap.json')
+        engine.load_model('cube', 'cube.obj')
+        instances = []
+        for x in range(-6, 7):
+            for z in range(-6, 7):
+                instance = engine.create_model_instance('cube', 'colormap')
+                instance.set_transformation(
+                    Transformer()
+                    .scale(0.4)
+                    .rotate(0.1 * x + 0.2 * z, (0.0, 1.0, 0.0,))
+                    .translate((x * 1.5, -1.0, z * 1.5,))
+                    .get_transformation()
+                )
+                instances.append(instance)
+        camera = engine.create_camera((48, 24,))
+
+        # Turn camera around grid, moving and deleting instances.
+        frames = []
+        for step in range(8):
+            camera.set_transformation(
+                Transformer(True)
+                .translate((0.0, 0.5, -2.0 + step,))
+                .rotate(step * math.pi / 4, (0.0, 1.0, 0.0,))
+                .get_transformation()
+            )
+            frames.append(engine.render_frame(camera, as_str=True))
+            instances[step * 7].set_transformation(
+                Transformer()
+                .translate((0.0, 0.0, 3.0 + step,))
+                .get_transformation()
+            )
+            engine.delete_model_instance(instances[step * 11 + 1])
+    finally:
+        engine.close()
+
+    return frames
+
+
+def test_indexed_frames_match_unindexed(resource_dir):
+    assert _render_grid(resource_dir, True) == _render_grid(
+        resource_dir,
+        False
+    )
+
+
+def test_indexed_scene_frames_match(render_frames, reference_frames):
+    assert render_frames(spatial_index=True) == reference_frames
+
+
+def test_octree_tracks_items():
+    octree = LooseOctree(cell_size=1.0, max_level=4)
+    octree.insert('small', ((0.0, 0.0, 0.0,), (0.5, 0.5, 0.5,),))
+    octree.insert('large', ((-3.0, -3.0, -3.0,), (3.0, 3.0, 3.0,),))
+    octree.insert('huge', ((-100.0, 0.0, 0.0,), (100.0, 1.0, 1.0,),))
+    octree.insert('unbounded', None)
+    assert len(octree) == 4
+    assert 'small' in octree and 'missing' not in octree
+
+    # Moving and removing items leaves no empty nodes behind.
+    octree.update('small', ((40.0, 40.0, 40.0,), (40.5, 40.5, 40.5,),))
+    octree.remove('large')
+    octree.remove('huge')
+    octree.remove('unbounded')
+    assert len(octree) == 1
+    octree.remove('small')
+    assert len(octree) == 0
+    assert octree._nodes == {} and octree._roots == {}
+    with pytest.raises(KeyError):
+        octree.remove('small')
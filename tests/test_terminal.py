@@ -0,0 +1,110 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+from io import StringIO
+from rendascii import terminal
+from rendascii.terminal import TerminalDisplay
+
+
+def _full_redraw(rows):
+    return terminal.ESC_CLEAR + ''.join(
+        terminal.ESC_MOVE.format(r + 1, 1) + rows[r]
+        for r
+        in range(len(rows))
+    )
+
+
+def _show(display, stream, frame):
+    # Return only the output of this frame.
+    stream.seek(0)
+    stream.truncate()
+    display.show(frame)
+    return stream.getvalue()
+
+
+def test_first_frame_is_drawn_in_full():
+    stream = StringIO()
+    display = TerminalDisplay(stream)
+
+    assert _show(display, stream, 'abc\ndef') == (
+        terminal.ESC_HIDE_CURSOR + _full_redraw(['abc', 'def'])
+    )
+
+
+def test_only_changed_cells_are_redrawn():
+    stream = StringIO()
+    display = TerminalDisplay(stream, max_run_gap=2)
+    display.show('abcdefghij\nklmnopqrst')
+
+    assert _show(display, stream, 'abcdefghij\nklmnopqrst') == ''
+    assert _show(display, stream, 'abcXefghij\nklmnopqrst') == (
+        terminal.ESC_MOVE.format(1, 4) + 'X'
+    )
+
+    # Nearby changes are bridged, distant ones moved to separately.
+    assert _show(display, stream, 'abcXefghij\nkYmYopqrsZ') == (
+        terminal.ESC_MOVE.format(2, 2) + 'YmY'
+        + terminal.ESC_MOVE.format(2, 10) + 'Z'
+    )
+
+
+def test_row_lists_are_drawn_bottom_row_first():
+    stream = StringIO()
+    display = TerminalDisplay(stream)
+    display.show([['d', 'e', 'f'], ['a', 'b', 'c']])
+
+    assert _show(display, stream, 'abc\ndeX') == (
+        terminal.ESC_MOVE.format(2, 3) + 'X'
+    )
+
+
+def test_resizing_redraws_in_full():
+    stream = StringIO()
+    display = TerminalDisplay(stream)
+    sizes = [(10, 5,)]
+    display._query_size = lambda: sizes[-1]
+    display.show('abcdef\nghijkl')
+
+    # Frames are cropped to the terminal, and redrawn when it resizes.
+    sizes.append((4, 1,))
+    assert _show(display, stream, 'abcdef\nghijkl') == _full_redraw(['abcd'])
+    assert _show(display, stream, 'abcdef\nghijkl') == ''
+    sizes.append((10, 5,))
+    assert _show(display, stream, 'abcdef\nghijkl') == (
+        _full_redraw(['abcdef', 'ghijkl'])
+    )
+
+
+def test_changed_row_lengths_redraw_in_full():
+    stream = StringIO()
+    display = TerminalDisplay(stream)
+    display.show('abc\ndef')
+
+    assert _show(display, stream, 'abcd\ndefg') == (
+        _full_redraw(['abcd', 'defg'])
+    )
+
+
+def test_invalidate_and_close():
+    stream = StringIO()
+    display = TerminalDisplay(stream)
+    display.show('abc\ndef')
+    display.invalidate()
+
+    assert _show(display, stream, 'abc\ndef') == _full_redraw(['abc', 'def'])
+    stream.seek(0)
+    stream.truncate()
+    display.close()
+    assert stream.getvalue() == (
+        terminal.ESC_MOVE.format(3, 1) + terminal.ESC_SHOW_CURSOR
+    )
+
+
+def test_diff_runs():
+    assert terminal.diff_runs('abcdef', 'abcdef') == []
+    assert terminal.diff_runs('abcdef', 'XbcdeX') == [(0, 1,), (5, 6,)]
+    assert terminal.diff_runs('abcdef', 'XbcdeX', 4) == [(0, 1,), (5, 6,)]
+    assert terminal.diff_runs('abcdef', 'XbcdeX', 5) == [(0, 6,)]
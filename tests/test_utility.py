@@ -0,0 +1,49 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+import pytest
+from rendascii.utility import RenderStats, STATS_COUNTS, STATS_STAGES
+
+
+def test_render_stats_record_frames(render_frames):
+    frames = []
+    stats = RenderStats(window=3, callback=frames.append)
+    render_frames(stats=stats)
+
+    # Every frame is recorded, within a rolling window.
+    assert stats.get_total_frames() == len(frames) == 8
+    assert stats.get_last_frame() is frames[-1]
+    for frame in frames:
+        assert set(frame['stage_times']) == set(STATS_STAGES)
+        assert set(frame['counts']) == set(STATS_COUNTS)
+        assert frame['frame_time'] == pytest.approx(
+            sum(frame['stage_times'].values())
+        )
+        assert frame['counts']['fragments'] > 0
+        assert frame['counts']['pickled_bytes'] == 0
+    averages = stats.get_averages()
+    assert averages['frame_time'] == pytest.approx(
+        sum(frame['frame_time'] for frame in frames[-3:]) / 3
+    )
+
+
+@pytest.mark.parametrize('count_pickled_bytes', (False, True,))
+def test_render_stats_count_pickled_bytes(
+    render_frames,
+    count_pickled_bytes
+):
+    frames = []
+    render_frames(
+        num_workers=2,
+        stats=RenderStats(
+            callback=frames.append,
+            count_pickled_bytes=count_pickled_bytes
+        )
+    )
+
+    # Pickled bytes are only measured on request.
+    for frame in frames:
+        assert (frame['counts']['pickled_bytes'] > 0) == count_pickled_bytes
@@ -0,0 +1,82 @@
+"""
+This file is part of RendASCII which is released under MIT.
+See file LICENSE.txt for full license details.
+"""
+
+
+import pytest
+from rendascii.interface import Engine
+from rendascii.pipeline import shared
+from rendascii.pipeline import RASTER_FRAGMENT, RASTER_SCANLINE
+from rendascii.utility import Transformer
+
+
+def _list_resident(index):
+    # Wait for every worker, so that each reports exactly once.
+    names = sorted(shared._resident)
+    shared._barrier.wait()
+    return names
+
+
+@pytest.mark.parametrize(
+    'rasterizer',
+    (RASTER_FRAGMENT, RASTER_SCANLINE,)
+)
+def test_pool_matches_single_process(
+    render_frames,
+    reference_frames,
+    rasterizer
+):
+    assert render_frames(
+        num_workers=2,
+        rasterizer=rasterizer
+    ) == reference_frames
+
+
+@pytest.mark.parametrize('chunk_size', (1, 7, 100000,))
+def test_chunk_sizes_match(render_frames, reference_frames, chunk_size):
+    assert render_frames(
+        num_workers=2,
+        chunk_size=chunk_size
+    ) == reference_frames
+
+
+def test_resident_models_are_evicted(resource_dir):
+    engine = Engine(
+        resource_dir,
+        resource_dir,
+        resource_dir,
+        resource_dir,
+        num_workers=2
+    )
+    try:
+        engine.load_colormap('colormap', 'colormap.json')
+        for model_name in ('kept', 'unloaded',):
+            engine.load_model(model_name, 'cube.obj')
+            instance = engine.create_model_instance(model_name, 'colormap')
+            instance.set_transformation(
+                Transformer().translate((0.0, 0.0, 5.0,)).get_transformation()
+            )
+        camera = engine.create_camera((40, 20,))
+        engine.render_frame(camera)
+
+        def list_resident():
+            return set(
+                name
+                for names
+                in engine._workers.map(_list_resident, range(2), 1)
+                for name
+                in names
+            )
+
+        # Vertices of both models become resident, until released.
+        assert list_resident() == {('kept', 0,), ('unloaded', 0,)}
+        for instance in tuple(engine._model_instances):
+            if instance._resource_name == 'unloaded':
+                engine.delete_model_instance(instance)
+        engine.unload_model('unloaded')
+        assert list_resident() <= {('kept', 0,)}
+        engine.load_model('kept', 'cube.obj')
+        assert list_resident() == set()
+    finally:
+        engine.close()